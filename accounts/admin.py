@@ -1,5 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.contrib.auth.models import Group, Permission
+from django.db.models import Prefetch
 from .models import User
 
 
@@ -68,5 +70,24 @@ class UserAdmin(BaseUserAdmin):
     ordering = ("username",)
     readonly_fields = ["updated_at","created_at"]
 
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        match = request.resolver_match
+        url_name = (match and match.url_name) or ""
+        if url_name.endswith("_changelist"):
+            # la liste n'affiche que les colonnes de list_display ; matricule
+            # est lu par __str__ (pages d'actions comme delete_selected)
+            qs = qs.only("id", "matricule", *self.list_display)
+        elif url_name.endswith("_change"):
+            # seul le formulaire d'édition affiche les groupes et permissions
+            qs = qs.prefetch_related(
+                Prefetch("groups", queryset=Group.objects.only("id", "name")),
+                Prefetch(
+                    "user_permissions",
+                    queryset=Permission.objects.only("id", "codename"),
+                ),
+            )
+        return qs
+
 
 admin.site.register(User, UserAdmin)
\ No newline at end of file
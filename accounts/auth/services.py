@@ -1,3 +1,4 @@
+import hashlib
 import logging
 
 from django.conf import settings
@@ -6,15 +7,35 @@ from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from accounts.core.jwt_utils import TokenManager
+from accounts.core.cache_utils import REDIS_ERRORS, get_redis_client
+from accounts.core.jwt_utils import TokenManager, invalidate_user_cache
+from accounts.core.rate_limit import (
+    is_login_locked,
+    record_failed_login,
+    reset_failed_logins,
+)
 from accounts.models import User
-from accounts.serializers import UserSerializer
+from accounts.verification.services import EmailVerificationService
 
 logger = logging.getLogger(__name__)
 
+LOGIN_KEY_SALT = settings.SECRET_KEY.encode()[:16]
+
+
+def _auth_user_payload(user):
+    """Données utilisateur minimales renvoyées à l'inscription et à la connexion."""
+    return {
+        "id": user.id,
+        "email": user.email,
+        "username": user.username,
+        "is_verified": user.is_verified,
+        "role": user.role,
+    }
+
 
 class AuthenticationService:
     """Service pour la gestion de l'authentification des utilisateurs."""
@@ -33,7 +54,7 @@ class AuthenticationService:
             returns:
                tuple"(success,response_dict,status_code)
         """
-        from accounts.verification.services import EmailVerificationService
+        from accounts.verification.tasks import send_verification_email_task
 
         if not email or not password:
             return False, "Email et mot de passe sont requis.", 400
@@ -44,16 +65,6 @@ class AuthenticationService:
                 f"Registration attempt from IP: {request_meta.get('REMOTE_ADDR')} "
             )
         try:
-
-            if User.objects.filter(email=email).exists():
-                return (
-                    False,
-                    {
-                        "success": False,
-                        "error": "Un utilisateur avec cet email existe déjà.",
-                    },
-                    400,
-                )
             # valider la complexité du mot de passe
             try:
                 validate_password(password)
@@ -66,42 +77,46 @@ class AuthenticationService:
                     },
                     400,
                 )
-            # créer l'utilisateur
-            user = User.objects.create_user(
-                email=email,
-                password=password,
-                phone_number=phone_number,
-                full_name=full_name,
-                is_verified=False,
-            )
-
-            # mettre a jour les champs supplémentaires si fournis
-            if phone_number:
-                user.phone_number = phone_number
-            if full_name:
-                user.full_name = full_name
-            user.save(update_fields=["phone_number", "full_name"])
+            # créer l'utilisateur (l'unicité de l'email est garantie par la base) ;
+            # le savepoint garde la transaction de l'appelant utilisable
+            try:
+                with transaction.atomic():
+                    user = User.objects.create_user(
+                        email=email,
+                        password=password,
+                        phone_number=phone_number,
+                        full_name=full_name or "",
+                        is_verified=False,
+                    )
+            except IntegrityError as e:
+                # matricule et username sont aussi uniques : seul un email
+                # déjà présent justifie ce message (requête sur l'échec seulement)
+                if User.objects.filter(email=email).exists():
+                    error = "Un utilisateur avec cet email existe déjà."
+                else:
+                    logger.warning(f"Registration integrity error: {str(e)}")
+                    error = "Matricule ou nom d'utilisateur déjà utilisé."
+                return False, {"success": False, "error": error}, 400
 
             # engage le processus de vérification par email ici si nécessaire
             if user.email and pj_settings.REQUIRE_EMAIL_VERIFICATION:
-                # utiliser le cache pour marquer que l'email doit etre envoyé
-                cache_key = f"send_verification_email_{user.id}"
-                cache.set(cache_key, True, timeout=3600)  # 1 heure
-
-                # lancer une tache asynchrone pour l'envoie de l'email
                 try:
-                    # rediriger au service de verification de l'email
-                    EmailVerificationService.send_verification_email_background(user.id)
+                    # confier l'envoi de l'email au worker celery, une fois
+                    # l'utilisateur commité pour que le worker le trouve
+                    user_id = user.id
+                    transaction.on_commit(
+                        lambda: send_verification_email_task.apply_async(
+                            args=[user_id], queue="email_queue"
+                        ),
+                        robust=True,
+                    )
                     logger.info(f"Verification email queued for user {user.email}")
-                except Exception as thread_error:
+                except Exception as queue_error:
                     # log but don't fail registration if email queueing fail
                     logger.error(
-                        f"Failed to queue verification email: {str(thread_error)}"
+                        f"Failed to queue verification email: {str(queue_error)}"
                     )
 
-            # serialize user data
-            serializer = UserSerializer(user)
-
             # Generate tokens
             tokens = TokenManager.generate_token(user)
 
@@ -114,7 +129,7 @@ class AuthenticationService:
                 {
                     "success": True,
                     "data": {
-                        "user": serializer.data,
+                        "user": _auth_user_payload(user),
                         "tokens": tokens,
                         "is_new_user": True,
                         "email_verified": user.is_verified,
@@ -154,10 +169,10 @@ class AuthenticationService:
                 400,
             )
 
-        # Normalize email for cache keys
-        safe_email = email.replace("@", "_at_").replace(".", "_")
-        LOCK_KEY = f"account_lockout_{safe_email}"
-        FAIL_KEY = f"failed_login_{safe_email}"
+        # Normalize email for cache keys (short, non enumerable digest)
+        safe_email = hashlib.blake2b(
+            email.lower().encode(), digest_size=12, key=LOGIN_KEY_SALT
+        ).hexdigest()
 
         # Log original attempt
         if request_meta:
@@ -167,7 +182,7 @@ class AuthenticationService:
 
         try:
             # Check lockout
-            if cache.get(LOCK_KEY):
+            if is_login_locked(safe_email):
                 logger.warning(f"Login attempt for locked account: {email}")
                 return (
                     False,
@@ -183,12 +198,10 @@ class AuthenticationService:
             user = authenticate(username=email, password=password)
 
             if not user:
-                failed_attempts = cache.get(FAIL_KEY, 0) + 1
-                cache.set(FAIL_KEY, failed_attempts, timeout=1800)
+                failed_attempts, locked = record_failed_login(safe_email)
 
                 # Lock after 5 attempts
-                if failed_attempts >= 5:
-                    cache.set(LOCK_KEY, True, timeout=900)
+                if locked:
                     logger.warning(f"Account locked (5 failed attempts): {email}")
                     return (
                         False,
@@ -214,14 +227,31 @@ class AuthenticationService:
                     403,
                 )
 
-            # SUCCESS → Reset failed attempts
-            cache.delete(FAIL_KEY)
-
-            serializer = UserSerializer(user)
-            tokens = TokenManager.generate_token(user)
+            # SUCCESS → Reset failed attempts and store the new token
+            # in a single redis round-trip
+            redis_client = get_redis_client()
+            pipe = redis_client.pipeline() if redis_client is not None else None
+            reset_failed_logins(safe_email, pipeline=pipe)
 
-            user.last_login = timezone.now()
-            user.save(update_fields=["last_login"])
+            tokens = TokenManager.generate_token(user, pipeline=pipe)
+            if pipe is not None:
+                try:
+                    pipe.execute()
+                except REDIS_ERRORS:
+                    # tokens still issued; they just miss the per-user revocation set
+                    logger.warning(f"Redis unavailable while storing login state for {email}")
+
+            # direct UPDATE: no model save() or signals on the login path
+            User.objects.filter(pk=user.pk).update(last_login=timezone.now())
+            # update() skips post_save, drop the cached user here
+            invalidate_user_cache(user.pk)
+
+            # warm the verification status read by check_verification_status
+            cache.set(
+                EmailVerificationService.get_verification_cache_key(user.id),
+                user.is_verified,
+                timeout=3600,
+            )
 
             logger.info(f"User logged in: {email}")
 
@@ -229,7 +259,7 @@ class AuthenticationService:
                 True,
                 {
                     "data": {
-                        "user": serializer.data,
+                        "user": _auth_user_payload(user),
                         "tokens": tokens,
                         "email_verified": user.is_verified,
                         "verification_needed": not user.is_verified
@@ -355,10 +385,12 @@ class AuthenticationService:
         # Invalidate specific token if providede
         if refresh_token:
             try:
+                # signature/expiry are checked locally, the blacklist itself
+                # is a single redis write (SADD + EXPIRE pipeline)
                 token = RefreshToken(refresh_token)
-                jti = token.get(jti)
+                jti = token.get("jti")
                 if jti:
-                    TokenManager.blacklist_token
+                    TokenManager.blacklist_token(jti)
                     logger.info(f"token blacklisted during logout : {jti}")
             except Exception as e:
                 logger.warning(f"Error blacklisting token during logout {str(e)}")
@@ -0,0 +1,168 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import threading
+import time
+
+from cachetools import TTLCache
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.encoding import force_bytes
+from rest_framework_simplejwt import settings as simplejwt_settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from .jwt_utils import USER_AUTH_TIMEOUT, user_auth_cache_key
+
+# tokens déjà validés par ce process : la signature et les claims ne sont
+# revérifiés qu'une fois toutes les 30 s pour un même token
+_VALIDATED_TOKENS = TTLCache(maxsize=10000, ttl=30)
+_validated_lock = threading.Lock()
+
+
+# contexte HMAC-SHA256 initialisé avec la clé, copié pour chaque vérification
+_HMAC_TEMPLATE = None  # (clé, hmac)
+
+
+@receiver(setting_changed)
+def _reset_token_caches(setting, **kwargs):
+    # comme jwt_utils : override_settings ne doit pas garder d'anciens tokens valides
+    global _HMAC_TEMPLATE
+    if setting in ("SIMPLE_JWT", "SECRET_KEY"):
+        with _validated_lock:
+            _VALIDATED_TOKENS.clear()
+        _HMAC_TEMPLATE = None
+
+
+def _user_auth_fields():
+    # colonnes mises en cache pour request.user ; le hash du mot de passe
+    # n'est pas stocké dans redis et reste chargé à la demande (champ différé)
+    return [
+        f for f in get_user_model()._meta.concrete_fields if f.attname != "password"
+    ]
+
+
+def _token_cache_key(raw_token):
+    return hashlib.sha256(raw_token).hexdigest()[:32]
+
+
+def _jwt_settings():
+    # SimpleJWT remplace son api_settings sur setting_changed, relu à chaque appel
+    return simplejwt_settings.api_settings
+
+
+def _hs256_fast_path_enabled():
+    """Le chemin HMAC ne vérifie que la signature, puis Token.verify().
+
+    Tout réglage que seul PyJWT applique au décodage (audience, issuer,
+    leeway, JWKS) renvoie vers la validation complète de SimpleJWT.
+    """
+    jwt_settings = _jwt_settings()
+    return (
+        jwt_settings.ALGORITHM == "HS256"
+        and jwt_settings.ISSUER is None
+        and jwt_settings.AUDIENCE is None
+        and not jwt_settings.LEEWAY
+        and not jwt_settings.JWK_URL
+        and len(jwt_settings.AUTH_TOKEN_CLASSES) == 1
+    )
+
+
+def _hmac_template():
+    global _HMAC_TEMPLATE
+    key = _jwt_settings().SIGNING_KEY
+    # reconstruit si SIMPLE_JWT change (override_settings)
+    if _HMAC_TEMPLATE is None or _HMAC_TEMPLATE[0] != key:
+        _HMAC_TEMPLATE = (key, hmac.new(force_bytes(key), digestmod=hashlib.sha256))
+    return _HMAC_TEMPLATE[1]
+
+
+def _signature_is_valid(raw_token):
+    signing_input, _, signature = raw_token.rpartition(b".")
+    if not signing_input:
+        return False
+    try:
+        expected = base64.urlsafe_b64decode(signature + b"=" * (-len(signature) % 4))
+    except (binascii.Error, ValueError):
+        return False
+    mac = _hmac_template().copy()
+    mac.update(signing_input)
+    return hmac.compare_digest(mac.digest(), expected)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication avec un cache mémoire des tokens déjà validés.
+
+    Les colonnes de l'utilisateur authentifié, hors mot de passe, sont
+    elles aussi mises en cache (cache partagé), invalidé à chaque
+    sauvegarde (voir accounts/signals.py).
+    """
+
+    def get_validated_token(self, raw_token):
+        key = _token_cache_key(raw_token)
+        with _validated_lock:
+            validated = _VALIDATED_TOKENS.get(key)
+        # un token expiré pendant le TTL repasse par la validation complète
+        if validated is not None and validated["exp"] > time.time():
+            return validated
+
+        if _hs256_fast_path_enabled():
+            validated = self._validate_hs256(raw_token)
+        else:
+            validated = super().get_validated_token(raw_token)
+        with _validated_lock:
+            _VALIDATED_TOKENS[key] = validated
+        return validated
+
+    def _validate_hs256(self, raw_token):
+        """Signature vérifiée avec le contexte HMAC pré-initialisé.
+
+        PyJWT ne fait alors que décoder le payload, les claims (exp, type
+        de token, jti) sont vérifiés par Token.verify() comme d'habitude.
+        """
+        AuthToken = _jwt_settings().AUTH_TOKEN_CLASSES[0]
+        try:
+            if not _signature_is_valid(raw_token):
+                raise TokenError("Token is invalid")
+            validated = AuthToken(raw_token, verify=False)
+            validated.verify()
+        except TokenError as e:
+            raise InvalidToken(
+                {
+                    "detail": "Given token not valid for any token type",
+                    "messages": [
+                        {
+                            "token_class": AuthToken.__name__,
+                            "token_type": AuthToken.token_type,
+                            "message": e.args[0],
+                        }
+                    ],
+                }
+            )
+        return validated
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(_jwt_settings().USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        cache_key = user_auth_cache_key(user_id)
+        fields = _user_auth_fields()
+        values = cache.get(cache_key)
+        if values is None:
+            # seuls les utilisateurs actifs passent, le cache ne garde que ceux-là
+            user = super().get_user(validated_token)
+            # valeurs brutes des colonnes : un FieldFile picklé embarquerait
+            # son instance, donc le User complet avec le hash du mot de passe
+            cache.set(
+                cache_key,
+                [f.get_prep_value(f.value_from_object(user)) for f in fields],
+                timeout=USER_AUTH_TIMEOUT,
+            )
+            return user
+        return get_user_model().from_db(
+            "default", [f.attname for f in fields], values
+        )
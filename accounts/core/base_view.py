@@ -1,5 +1,4 @@
 import logging
-import traceback
 
 from rest_framework import status
 from rest_framework.exceptions import AuthenticationFailed
@@ -24,10 +23,8 @@ class BaseAPIView(APIView):
                 status=status.HTTP_401_UNAUTHORIZED,
             )
 
-        # Log the exception with traceback
-        logger.error(f"Exception in {self.__class__.__name__}: {str(exc)}")
-        traceback_str = "".join(traceback.format_tb(exc.__traceback__))
-        logger.error(f"Traceback: {traceback_str}")
+        # Log the exception, the traceback is only formatted if the record is emitted
+        logger.exception("Exception in %s", self.__class__.__name__, exc_info=exc)
 
         # Call the parent class's handle_exception method
         return super().handle_exception(exc)
@@ -0,0 +1,13 @@
+-- Met en liste noire tous les tokens actifs d'un utilisateur, atomiquement.
+-- KEYS[1] : set des jti actifs de l'utilisateur
+-- KEYS[2] : bucket courant de la liste noire
+-- ARGV[1] : durée de vie du bucket (s)
+local toks = redis.call('SMEMBERS', KEYS[1])
+for i = 1, #toks do
+    redis.call('SADD', KEYS[2], toks[i])
+end
+if #toks > 0 then
+    redis.call('EXPIRE', KEYS[2], ARGV[1])
+end
+redis.call('DEL', KEYS[1])
+return #toks
@@ -0,0 +1,39 @@
+from pathlib import Path
+
+from django.core.cache import cache
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+_SCRIPTS = {}
+
+# redis injoignable : IGNORE_EXCEPTIONS ne couvre que l'API cache.*, les
+# appels faits avec get_redis_client() doivent intercepter ces erreurs
+REDIS_ERRORS = (RedisConnectionError, RedisTimeoutError)
+
+
+def get_redis_client():
+    """Retourne le client redis natif du cache par défaut.
+
+    Returns:
+        Redis | None: le client redis, ou None si le cache n'est pas
+        redis (ex: LocMemCache pendant les tests).
+    """
+    if not hasattr(cache, "client"):
+        return None
+    return cache.client.get_client()
+
+
+def get_script(client, name):
+    """Charge et enregistre un script lua de accounts/core une seule fois.
+
+    Args:
+        client (Redis): client redis natif
+        name (str): nom du fichier, ex: "rate_limit.lua"
+    Returns:
+        Script: script réutilisable (EVALSHA)
+    """
+    script = _SCRIPTS.get(name)
+    if script is None:
+        src = Path(__file__).with_name(name).read_text()
+        script = _SCRIPTS[name] = client.register_script(src)
+    return script
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """Argon2id avec des paramètres calibrés pour l'hôte.
+
+    Les valeurs viennent des settings ARGON2_* (voir la commande
+    calibrate_argon2). Les hashs existants avec d'autres paramètres sont
+    recalculés automatiquement à la prochaine connexion réussie.
+    """
+
+    @property
+    def time_cost(self):
+        return settings.ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.ARGON2_PARALLELISM
@@ -1,26 +1,187 @@
+import hashlib
 import logging
+import secrets
 import time
-import uuid
-from datetime import datetime, timedelta
+from collections import defaultdict
+from datetime import timedelta
 
 import jwt
 from django.conf import settings
 from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from rest_framework_simplejwt.tokens import RefreshToken, TokenError
 
+from .cache_utils import REDIS_ERRORS, get_redis_client, get_script
+
 logger = logging.getLogger(__name__)
 
 
+def _load_jwt_settings():
+    """Fige la configuration SIMPLE_JWT au niveau du module."""
+    global _ALGO, _KEY, _ACCESS_TTL_SEC, _REFRESH_TTL_SEC, _ROTATE, _BLACKLIST_TTL
+    global _DECODE_KWARGS
+    cfg = settings.SIMPLE_JWT
+    _ALGO = cfg.get("ALGORITHM", "HS256")
+    _KEY = cfg.get("SIGNING_KEY", settings.SECRET_KEY)
+    _ACCESS_TTL_SEC = int(
+        cfg.get("ACCESS_TOKEN_LIFETIME", timedelta(minutes=15)).total_seconds()
+    )
+    _REFRESH_TTL_SEC = int(
+        cfg.get("REFRESH_TOKEN_LIFETIME", timedelta(days=14)).total_seconds()
+    )
+    _ROTATE = cfg.get("ROTATE_REFRESH_TOKENS", True)
+    _BLACKLIST_TTL = cfg.get("BLACKLIST_TIMEOUT", 86400)
+    # arguments de jwt.decode construits une fois (clé déjà encodée en bytes)
+    _DECODE_KWARGS = {
+        "key": _KEY.encode() if isinstance(_KEY, str) else _KEY,
+        "algorithms": [_ALGO],
+        "options": {"require": ["exp", "iat"]},
+    }
+
+
+_load_jwt_settings()
+
+
+@receiver(setting_changed)
+def _reload_jwt_settings(setting, **kwargs):
+    # permet aux tests d'utiliser override_settings
+    if setting in ("SIMPLE_JWT", "SECRET_KEY"):
+        _load_jwt_settings()
+
+
+USER_LIGHT_FIELDS = ("id", "is_active", "is_staff", "is_verified", "username", "email")
+USER_LIGHT_TIMEOUT = 60
+USER_AUTH_TIMEOUT = 60
+
+
+def _blacklist_bucket_key(bucket):
+    return f"blacklist:bucket:{bucket}"
+
+
+def _blacklist_cache_key(jti):
+    return f"blacklisted_tokens:{jti}"
+
+
+def _user_tokens_key(user_id):
+    return f"user_tokens:{user_id}"
+
+
+class _RedisUserTokens:
+    """Jti actifs d'un utilisateur, dans un set redis."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def add(self, user_id, jti, ttl, pipeline=None):
+        key = _user_tokens_key(user_id)
+        pipe = pipeline if pipeline is not None else self.client.pipeline()
+        pipe.sadd(key, jti)
+        pipe.expire(key, int(ttl))
+        if pipeline is None:
+            pipe.execute()
+
+    def revoke_all(self, user_id):
+        # un seul EVAL atomique, voir blacklist_user_tokens.lua
+        script = get_script(self.client, "blacklist_user_tokens.lua")
+        bucket_key = _blacklist_bucket_key(int(time.time()) // _BLACKLIST_TTL)
+        return int(
+            script(
+                keys=[_user_tokens_key(user_id), bucket_key],
+                args=[2 * _BLACKLIST_TTL],
+            )
+        )
+
+
+class _LocalUserTokens:
+    """Émulation en mémoire du set redis (LocMemCache, tests)."""
+
+    def __init__(self):
+        self._tokens = defaultdict(dict)
+
+    def add(self, user_id, jti, ttl, pipeline=None):
+        now = time.time()
+        tokens = self._tokens[user_id]
+        for expired in [j for j, exp in tokens.items() if exp <= now]:
+            del tokens[expired]
+        tokens[jti] = now + ttl
+
+    def revoke_all(self, user_id):
+        now = time.time()
+        jtis = [j for j, exp in self._tokens.pop(user_id, {}).items() if exp > now]
+        if jtis:
+            # un seul appel au cache pour tous les tokens de l'utilisateur
+            cache.set_many(
+                {_blacklist_cache_key(jti): True for jti in jtis},
+                timeout=_BLACKLIST_TTL,
+            )
+        return len(jtis)
+
+
+_local_user_tokens = _LocalUserTokens()
+
+
+def _user_tokens_backend():
+    client = get_redis_client()
+    if client is not None:
+        return _RedisUserTokens(client)
+    return _local_user_tokens
+
+
+def user_light_cache_key(user_id):
+    return f"user:light:{user_id}"
+
+
+def user_auth_cache_key(user_id):
+    return f"user:auth:{user_id}"
+
+
+def invalidate_user_cache(user_id):
+    """Supprime les utilisateurs mis en cache (refresh des tokens et authentification).
+
+    À appeler après tout QuerySet.update() sur un utilisateur, qui ne
+    déclenche pas post_save.
+    """
+    cache.delete_many([user_light_cache_key(user_id), user_auth_cache_key(user_id)])
+
+
+def _get_user_light(user_id):
+    """Charge uniquement les champs utiles au rafraîchissement des tokens.
+
+    Le résultat est mis en cache brièvement, il est invalidé à chaque
+    sauvegarde de l'utilisateur (voir accounts/signals.py).
+
+    Raises:
+        User.DoesNotExist: si l'utilisateur n'existe pas
+    """
+    from accounts.models import User
+
+    cache_key = user_light_cache_key(user_id)
+    data = cache.get(cache_key)
+    if data is None:
+        user = User.objects.only(*USER_LIGHT_FIELDS).get(id=user_id)
+        data = {field: getattr(user, field) for field in USER_LIGHT_FIELDS}
+        cache.set(cache_key, data, timeout=USER_LIGHT_TIMEOUT)
+        return user
+    return User(**data)
+
+
 class TokenManager:
     """Gestion des tokens JWT."""
 
     @staticmethod
-    def generate_token(user):
-        """Génère un token JWT pour un utilisateur donné."""
+    def generate_token(user, pipeline=None):
+        """Génère un token JWT pour un utilisateur donné.
+
+        Args:
+            user (User): l'utilisateur
+            pipeline (Pipeline, optional): pipeline redis auquel ajouter les
+                écritures du cache, exécuté par l'appelant.
+        """
 
         try:
             refresh = RefreshToken.for_user(user)
-            jti = str(uuid.uuid4())
+            jti = secrets.token_urlsafe(16)
 
             refresh["jti"] = jti
             refresh["username"] = user.username
@@ -30,20 +191,19 @@ class TokenManager:
             refresh["type"] = "refresh"
 
             access_token = refresh.access_token
-            access_token["jti"] = str(uuid.uuid4())
+            # dérivé du jti du refresh token, sans nouveau tirage aléatoire
+            access_token["jti"] = hashlib.blake2b(
+                jti.encode(), digest_size=12
+            ).hexdigest()
             access_token["type"] = "access"
 
-            # get token expiry settings
-            access_expiry = settings.SIMPLE_JWT.get(
-                "ACCESS_TOKEN_LIFETIME", timedelta(minutes=15)
-            )
-            refresh_expiry = settings.SIMPLE_JWT.get(
-                "REFRESH_TOKEN_LIFETIME", timedelta(days=14)
-            )
-
             # store tokens in cache for potential revocation
             TokenManager._store_token_metadata(
-                user.id, jti, "refresh", refresh_expiry.total_seconds()
+                user.id,
+                jti,
+                "refresh",
+                _REFRESH_TTL_SEC,
+                pipeline=pipeline,
             )
 
             # return full token package
@@ -51,8 +211,8 @@ class TokenManager:
                 "access": str(access_token),
                 "refresh": str(refresh),
                 "token_type": "Bearer",
-                "access_expires_in": int(access_expiry.total_seconds()),
-                "refresh_expires_in": int(refresh_expiry.total_seconds()),
+                "access_expires_in": _ACCESS_TTL_SEC,
+                "refresh_expires_in": _REFRESH_TTL_SEC,
                 "user_id": user.id,
                 "issued_at": int(time.time()),
             }
@@ -73,21 +233,18 @@ class TokenManager:
                 )
                 raise TokenError("Token is blacklisted or invalid")
             user_id = token.get("user_id")
-            from accounts.models import User
 
             try:
-                user = User.objects.get(id=user_id)
-            except:
+                user = _get_user_light(user_id)
+            except Exception:
                 logger.warning(f"User not found for token refresh: {user_id}")
                 raise TokenError("Invalid token ")
 
             if not user.is_active:
-                logger.warning(
-                    f"Inactive user attempted token refresh: {user.matricule}"
-                )
+                logger.warning(f"Inactive user attempted token refresh: {user.id}")
                 TokenManager.blacklist_token(jti)
                 raise TokenError("User is inactive")
-            if settings.SIMPLE_JWT.get("ROTATE_REFRESH_TOKENS", True):
+            if _ROTATE:
                 # Blacklist the old token
                 TokenManager.blacklist_token(jti)
                 # Generate a new token pair
@@ -105,24 +262,9 @@ class TokenManager:
         return tuple ( is_valid, user_id, token_type)
         """
         try:
-            """first use pyjwt to decode and verify the token"""
-            unverified = jwt.decode(
-                token_str,
-                options={"verify_signature": False},
-            )
-            algorithms = unverified.get(
-                "algorithms", settings.SIMPLE_JWT.get("ALGORITHM", "HS256")
-            )
-            # now properly decode
-            decoded = jwt.decode(
-                token_str,
-                settings.SIMPLE_JWT.get("SIGNING_KEY", settings.SECRET_KEY),
-                algorithms=[algorithms],
-                options={"verify_signature": True},
-            )
+            decoded = jwt.decode(token_str, **_DECODE_KWARGS)
 
             # check token type
-
             token_type = decoded.get("token_type", decoded.get("type", "access"))
             user_id = decoded.get("user_id")
             jti = decoded.get("jti")
@@ -132,45 +274,24 @@ class TokenManager:
                 logger.warning(f"Attempt to use blacklisted token: {jti}")
                 return False, None, None
 
-            # check expiration
-            exp_timestamp = decoded.get("exp", 0)
-            if exp_timestamp < time.time():
-                logger.debug(
-                    f"Token has expired at : {datetime.fromtimestamp(exp_timestamp).isoformat()}"
-                )
-                return False, None, None
+            # l'expiration est déjà vérifiée par jwt.decode
             return True, user_id, token_type
-        except jwt.PyJWKError as e:
-            logger.error(f"token validation error: {str(e)}")
-            return False, None, None
         except jwt.ExpiredSignatureError:
             logger.warning("Token has expired")
-            return None
-        except jwt.InvalidTokenError as e:
+            return False, None, None
+        except jwt.PyJWTError as e:
             logger.error(f"Invalid token error: {str(e)}")
-            return None
+            return False, None, None
 
     @staticmethod
-    def _store_token_metadata(user_id, jti, token_type, expiry_seconds):
-        """Stocke les métadonnées du token dans le cache pour la révocation."""
+    def _store_token_metadata(user_id, jti, token_type, expiry_seconds, pipeline=None):
+        """Stocke les métadonnées du token dans le cache pour la révocation.
+
+        Si un pipeline redis est fourni, les commandes y sont ajoutées et
+        l'appelant est responsable de son exécution.
+        """
         try:
-            # verifie si on utilise redis ou cache memoire
-            if hasattr(cache, "client"):
-                # redis implementation
-                user_tokens_key = f"user_tokens: {user_id}"
-                pipe = cache.client.pipeline()
-                pipe.sadd(user_tokens_key, jti)
-                pipe.expire(user_tokens_key, int(expiry_seconds))
-                pipe.execute()
-            else:
-                # memory cache implementation
-                user_tokens_key = f"user_tokens_{user_id}"
-                existing_tokens = cache.get(user_tokens_key, set())
-
-                if not isinstance(existing_tokens, set):
-                    existing_tokens = set()
-                existing_tokens.add(jti)
-                cache.set(user_tokens_key, existing_tokens, timeout=int(expiry_seconds))
+            _user_tokens_backend().add(user_id, jti, expiry_seconds, pipeline=pipeline)
         except Exception as e:
             logger.error(f"Error storing token metadata: {str(e)}")
 
@@ -179,50 +300,46 @@ class TokenManager:
         """Vérifie si un token est dans la liste noire."""
         if not jti:
             return False
-        blacklist_key = f"blacklisted_tokens:{jti}"
-        return cache.get(blacklist_key) is not None
+        client = get_redis_client()
+        if client is not None:
+            # un seul aller-retour pour le bucket courant et le précédent
+            bucket = int(time.time()) // _BLACKLIST_TTL
+            pipe = client.pipeline(transaction=False)
+            pipe.sismember(_blacklist_bucket_key(bucket), jti)
+            pipe.sismember(_blacklist_bucket_key(bucket - 1), jti)
+            try:
+                return any(pipe.execute())
+            except REDIS_ERRORS:
+                # fail closed : un token révoqué ne doit pas redevenir valide
+                logger.error(f"Redis unavailable, token {jti} treated as blacklisted")
+                return True
+        return cache.get(_blacklist_cache_key(jti)) is not None
 
     @staticmethod
     def blacklist_token(jti):
         if not jti:
             return False
-        blacklist_key = f"blacklisted_tokens:{jti}"
-        cache.set(
-            blacklist_key,
-            True,
-            timeout=settings.SIMPLE_JWT.get("BLACKLIST_TIMEOUT", 86400),
-        )
+        client = get_redis_client()
+        if client is not None:
+            # les buckets couvrent chacun une durée _BLACKLIST_TTL et expirent
+            # d'eux-mêmes, chaque jti reste donc au moins _BLACKLIST_TTL secondes
+            bucket_key = _blacklist_bucket_key(int(time.time()) // _BLACKLIST_TTL)
+            pipe = client.pipeline()
+            pipe.sadd(bucket_key, jti)
+            pipe.expire(bucket_key, 2 * _BLACKLIST_TTL)
+            try:
+                pipe.execute()
+            except REDIS_ERRORS:
+                logger.error(f"Redis unavailable, token {jti} not blacklisted")
+                return False
+            return
+        cache.set(_blacklist_cache_key(jti), True, timeout=_BLACKLIST_TTL)
 
     @staticmethod
     def blacklist_all_user_tokens(user_id):
         """Met tous les tokens d'un utilisateur dans la liste noire."""
         try:
-            user_tokens_key = f"user_tokens:{user_id}"
-            if hasattr(cache, "client"):
-                # reddis implementation
-                actives_tokens = cache.client.smembers(user_tokens_key)
-                if not actives_tokens:
-                    return 0
-                # blackliste chaque token
-                for jti in actives_tokens:
-                    (
-                        TokenManager.blacklist_token(jti.decode("utf-8"))
-                        if isinstance(jti, bytes)
-                        else jti
-                    )
-                # supprime la liste des tokens actifs
-                cache.client.delete(user_tokens_key)
-                return len(actives_tokens)
-            else:
-                # implementation generic pour LocMemCache
-                token_set = cache.get(user_tokens_key, set())
-                if not token_set:
-                    return 0
-                for jti in token_set:
-                    TokenManager.blacklist_token(jti)
-                # supprime la liste des tokens actifs
-                cache.delete(user_tokens_key)
-                return len(token_set)
+            return _user_tokens_backend().revoke_all(user_id)
         except Exception as e:
             logger.error(f"Error blacklisting tokens for user {user_id}: {str(e)}")
             return 0
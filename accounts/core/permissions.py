@@ -0,0 +1,18 @@
+from rest_framework.permissions import BasePermission
+
+
+class IsStaffClaim(BasePermission):
+    """Accès réservé au staff, lu depuis le claim is_staff du token.
+
+    Le claim est posé par TokenManager.generate_token ; un retrait des
+    droits staff prend effet à l'expiration du token d'accès.
+    """
+
+    def has_permission(self, request, view):
+        token = request.auth
+        return bool(
+            request.user
+            and request.user.is_authenticated
+            and token is not None
+            and token.get("is_staff")
+        )
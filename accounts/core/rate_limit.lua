@@ -0,0 +1,26 @@
+-- Fenêtre glissante des échecs de connexion, en un seul aller-retour.
+-- KEYS[1] : clé du compteur (sorted set)
+-- ARGV[1] : horodatage courant (ms)
+-- ARGV[2] : taille de la fenêtre (ms)
+-- ARGV[3] : nombre d'échecs avant verrouillage
+-- ARGV[4] : "1" pour enregistrer un nouvel échec, "0" pour simplement compter
+-- ARGV[5] : identifiant unique de l'échec
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+
+redis.call('ZREMRANGEBYSCORE', key, 0, now - window)
+local count = redis.call('ZCARD', key)
+
+if ARGV[4] == '1' and count < limit then
+    redis.call('ZADD', key, now, ARGV[5])
+    redis.call('PEXPIRE', key, window)
+    count = count + 1
+end
+
+local locked = 0
+if count >= limit then
+    locked = 1
+end
+return {count, locked}
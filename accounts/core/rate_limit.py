@@ -0,0 +1,100 @@
+import logging
+import time
+import uuid
+
+from django.core.cache import cache
+
+from .cache_utils import REDIS_ERRORS, get_redis_client, get_script
+
+logger = logging.getLogger(__name__)
+
+LOGIN_WINDOW_SECONDS = 1800  # 30 minutes
+LOGIN_LOCKOUT_SECONDS = 900  # 15 minutes (LocMemCache uniquement)
+LOGIN_MAX_ATTEMPTS = 5
+
+
+def _run_login_script(client, key, record):
+    script = get_script(client, "rate_limit.lua")
+    count, locked = script(
+        keys=[f"fail:{key}"],
+        args=[
+            int(time.time() * 1000),
+            LOGIN_WINDOW_SECONDS * 1000,
+            LOGIN_MAX_ATTEMPTS,
+            1 if record else 0,
+            uuid.uuid4().hex,
+        ],
+    )
+    return int(count), bool(locked)
+
+
+def is_login_locked(key):
+    """Vérifie si le compte identifié par `key` est verrouillé.
+
+    Args:
+        key (str): identifiant normalisé du compte.
+    Returns:
+        bool: True si le compte est verrouillé
+    """
+    client = get_redis_client()
+    if client is not None:
+        try:
+            return _run_login_script(client, key, record=False)[1]
+        except REDIS_ERRORS:
+            # fail open : sans redis le mot de passe reste vérifié, seul le
+            # verrouillage est suspendu
+            logger.warning("Redis unavailable, login lockout not checked")
+            return False
+    return bool(cache.get(f"account_lockout_{key}"))
+
+
+def record_failed_login(key):
+    """Enregistre un échec de connexion.
+
+    Sur redis, le comptage est fait par une fenêtre glissante atomique
+    (voir rate_limit.lua).
+
+    Args:
+        key (str): identifiant normalisé du compte.
+    Returns:
+        tuple: (failed_attempts, locked)
+    """
+    client = get_redis_client()
+    if client is not None:
+        try:
+            return _run_login_script(client, key, record=True)
+        except REDIS_ERRORS:
+            logger.warning("Redis unavailable, failed login not recorded")
+            return 0, False
+
+    # add() ne pose le TTL qu'au premier échec, la fenêtre ne glisse donc
+    # pas indéfiniment; incr() évite le get + set
+    fail_key = f"failed_login_{key}"
+    cache.add(fail_key, 0, timeout=LOGIN_WINDOW_SECONDS)
+    try:
+        failed_attempts = cache.incr(fail_key)
+    except ValueError:
+        # la clé a expiré entre add() et incr()
+        cache.add(fail_key, 1, timeout=LOGIN_WINDOW_SECONDS)
+        failed_attempts = 1
+    locked = failed_attempts >= LOGIN_MAX_ATTEMPTS
+    if locked:
+        cache.add(f"account_lockout_{key}", True, timeout=LOGIN_LOCKOUT_SECONDS)
+    return failed_attempts, locked
+
+
+def reset_failed_logins(key, pipeline=None):
+    """Réinitialise le compteur d'échecs après une connexion réussie.
+
+    Args:
+        key (str): identifiant normalisé du compte.
+        pipeline (Pipeline, optional): pipeline redis exécuté par l'appelant.
+    """
+    client = get_redis_client()
+    if client is not None:
+        try:
+            (pipeline if pipeline is not None else client).delete(f"fail:{key}")
+        except REDIS_ERRORS:
+            logger.warning("Redis unavailable, failed logins not reset")
+    else:
+        cache.delete(f"failed_login_{key}")
@@ -0,0 +1,26 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+
+class ORJSONRenderer(JSONRenderer):
+    """Renderer JSON basé sur orjson.
+
+    Les types non gérés par orjson (Decimal, chaînes lazy, ...) sont
+    délégués à l'encodeur de DRF, ainsi que les dates : le format reste
+    celui de DRF (isoformat, suffixe Z pour UTC). Les clés non str (int,
+    UUID, ...) sont converties comme le fait json ; une indentation demandée
+    via le media type repasse par le rendu de DRF.
+    """
+
+    media_type = "application/json"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(
+            data,
+            default=self.encoder_class().default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+        )
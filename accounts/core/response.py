@@ -11,14 +11,10 @@ def standardized_response(success=True, data=None, error=None, message=None, **k
         Returns:
             dict: Dictionnaire formaté pour la réponse API.
     """
-    response = {"success": success}
-
-    if data is not None:
-        response["data"] = data
-    if error is not None:
-        response["error"] = error
-    if message is not None:
-        response["message"] = message
-    for key, value in kwargs.items():
-        response[key] = value
-    return response
+    return {
+        "success": success,
+        **({"data": data} if data is not None else {}),
+        **({"error": error} if error is not None else {}),
+        **({"message": message} if message is not None else {}),
+        **kwargs,
+    }
@@ -0,0 +1,46 @@
+import logging
+
+from rest_framework.throttling import UserRateThrottle
+
+from accounts.core.cache_utils import REDIS_ERRORS, get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class RedisUserRateThrottle(UserRateThrottle):
+    """UserRateThrottle à fenêtre fixe, un seul aller-retour redis.
+
+    INCR + EXPIRE NX sont envoyés dans le même pipeline au lieu du get/set
+    de l'historique de DRF. Sans redis (LocMemCache), l'implémentation de
+    DRF est utilisée telle quelle.
+    """
+
+    _remaining = None
+
+    def allow_request(self, request, view):
+        client = get_redis_client()
+        if client is None or self.rate is None:
+            return super().allow_request(request, view)
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        pipe = client.pipeline()
+        pipe.incr(self.key)
+        # NX : la fenêtre démarre à la première requête, sans être prolongée
+        pipe.expire(self.key, self.duration, nx=True)
+        pipe.ttl(self.key)
+        try:
+            count, _, self._remaining = pipe.execute()
+        except REDIS_ERRORS:
+            # fail open, comme le throttle de DRF avec IGNORE_EXCEPTIONS
+            logger.warning("Redis unavailable, request not throttled")
+            self._remaining = None
+            return True
+        return count <= self.num_requests
+
+    def wait(self):
+        if self._remaining is None:
+            return super().wait()
+        return max(self._remaining, 0)
@@ -0,0 +1,54 @@
+import time
+
+from django.contrib.auth.hashers import Argon2PasswordHasher
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Mesure make_password avec Argon2 et propose les paramètres ARGON2_*"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--target-ms", type=int, default=250)
+        parser.add_argument("--memory-kib", type=int, default=64 * 1024)
+        parser.add_argument("--parallelism", type=int, default=2)
+        parser.add_argument("--max-time-cost", type=int, default=20)
+        parser.add_argument("--rounds", type=int, default=3)
+
+    def handle(self, *args, **options):
+        target = options["target_ms"] / 1000
+        hasher = Argon2PasswordHasher()
+        hasher.memory_cost = options["memory_kib"]
+        hasher.parallelism = options["parallelism"]
+
+        elapsed = 0.0
+        for time_cost in range(1, options["max_time_cost"] + 1):
+            hasher.time_cost = time_cost
+            elapsed = self._measure(hasher, options["rounds"])
+            self.stdout.write(f"time_cost={time_cost}: {elapsed * 1000:.0f} ms")
+            if elapsed >= target:
+                break
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"ARGON2_TIME_COST={hasher.time_cost}\n"
+                f"ARGON2_MEMORY_COST={hasher.memory_cost}\n"
+                f"ARGON2_PARALLELISM={hasher.parallelism}"
+            )
+        )
+        if elapsed < target:
+            self.stdout.write(
+                self.style.WARNING(
+                    "Seuil non atteint, augmentez --memory-kib ou --max-time-cost."
+                )
+            )
+
+    @staticmethod
+    def _measure(hasher, rounds):
+        # le meilleur temps limite le bruit des autres processus
+        best = None
+        for _ in range(rounds):
+            start = time.perf_counter()
+            hasher.encode("x", hasher.salt())
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
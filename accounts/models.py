@@ -98,7 +98,12 @@ class User(AbstractBaseUser, PermissionsMixin):
     # unique_together = ("school", "matricule")
 
     def __str__(self):
-        return f"{self.username} ({self.matricule} - {self.school.id})"
+        # school_id est la colonne déjà chargée, school.id ferait une requête
+        # (et la FK school est désactivée pour l'instant)
+        school_id = getattr(self, "school_id", None)
+        if school_id is None:
+            return f"{self.username} ({self.matricule})"
+        return f"{self.username} ({self.matricule} - {school_id})"
 
     def get_full_name(self):
         return f"{self.first_name} {self.last_name}".strip() or self.username
@@ -1,34 +1,80 @@
 import logging
-import os
 
+from django.contrib.auth.hashers import check_password
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import InMemoryUploadedFile, UploadedFile
+from django.db import transaction
+from rest_framework.fields import DateTimeField
 
 from accounts.core.jwt_utils import TokenManager
 from accounts.serializers import UserSerializer
 
 logger = logging.getLogger(__name__)
 
+# Pillow format -> stored file extension
+IMAGE_FORMATS = {"JPEG": "jpg", "PNG": "png", "GIF": "gif", "WEBP": "webp"}
+
+# request keys handled outside of the serializer
+_STRIP = frozenset({"profile_picture", "current_password", "new_password"})
+
+# same output format as the serializer's DateTimeField
+_DATETIME_FIELD = DateTimeField()
+
 
 class ProfileService:
     @staticmethod
-    def get_profile(user):
+    def get_profile(user, request=None):
         """Get userprofile
 
         Args:
             user (object): user object
+            request (Request, optional): used to build absolute media urls
+
+        Returns:
+            dict: serialized user data
+        """
+        return ProfileService._fast_serialize(user, request)
+
+    @staticmethod
+    def _fast_serialize(user, request=None):
+        """Build the UserSerializer payload without binding DRF fields
+
+        UserSerializer is only used to validate writes. Keep the keys in sync
+        with UserSerializer.Meta.fields.
+
+        Args:
+            user (object): user object
+            request (Request, optional): used to build absolute media urls
 
         Returns:
             dict: serialized user data
         """
-        serializer = UserSerializer(user)
-        return serializer.data
+        picture_url = None
+        if user.profile_picture:
+            picture_url = user.profile_picture.url
+            if request is not None:
+                picture_url = request.build_absolute_uri(picture_url)
+        return {
+            "id": user.id,
+            "email": user.email,
+            "phone_number": user.phone_number,
+            "first_name": user.first_name,
+            "last_name": user.last_name,
+            "username": user.username,
+            "profile_picture": picture_url,
+            "profile_picture_url": picture_url,
+            "created_at": _DATETIME_FIELD.to_representation(user.created_at),
+        }
 
     @staticmethod
     def update_profile(user, data, files=None):
         """Update user profile data
 
+        Every change is applied to the instance in memory and written with a
+        single UPDATE; side effects (old picture removal, token revocation)
+        only run once that UPDATE is committed.
+
         Args:
             user (object): User object
             data (dict): Update profile data
@@ -37,50 +83,66 @@ class ProfileService:
             tuple : (success,response_dict,status_code)
         """
         try:
-            # Handle profile picture file if provided
-            if files and "profile_picture" in files:
-                success = ProfileService._process_profile_picture_file(
-                    user, files["profile_picture"]
-                )
-                if not success:
-                    return (
-                        False,
-                        {
-                            "success": False,
-                            "error": "Failed to process profile picture",
-                        },
-                        400,
+            with transaction.atomic():
+                dirty_fields = set()
+
+                # Handle profile picture file if provided
+                if files and "profile_picture" in files:
+                    picture_fields = ProfileService._process_profile_picture_file(
+                        user, files["profile_picture"]
                     )
-            # Handle password change if provided
-            if "current_password" in data and "new_password" in data:
-                result = ProfileService._process_password_change(
-                    user, data.get("current_password"), data.get("new_password")
-                )
-                if not result["success"]:
-                    return False, {"success": False, "error": result["error"]}, 400
-            # Remove processed fields before passing to serializer
-            safe_data = {
-                k: v
-                for k, v in data.items()
-                if k not in ["profile_picture", "current_password", "new_password"]
-            }
-
-            # update through serializer
-            serializer = UserSerializer(user, data=safe_data, partial=True)
-
-            if serializer.is_valid():
-                serializer.save()
-                return (
-                    True,
-                    {
-                        "success": True,
-                        "data": serializer.data,
-                        "message": "Profile updated successfully",
-                    },
-                    200,
-                )
+                    if not picture_fields:
+                        transaction.set_rollback(True)
+                        return (
+                            False,
+                            {
+                                "success": False,
+                                "error": "Failed to process profile picture",
+                            },
+                            400,
+                        )
+                    dirty_fields.update(picture_fields)
+                # Handle password change if provided
+                if "current_password" in data and "new_password" in data:
+                    result = ProfileService._process_password_change(
+                        user, data.get("current_password"), data.get("new_password")
+                    )
+                    if not result["success"]:
+                        transaction.set_rollback(True)
+                        return False, {"success": False, "error": result["error"]}, 400
+                    dirty_fields.update(result["update_fields"])
+                # Remove processed fields before passing to serializer
+                safe_data = {
+                    k: v
+                    for k, v in data.items()
+                    if k not in _STRIP
+                }
+
+                # validate through serializer (skipped for picture/password only
+                # updates), the instance is saved below
+                if safe_data:
+                    serializer = UserSerializer(user, data=safe_data, partial=True)
+                    if not serializer.is_valid():
+                        transaction.set_rollback(True)
+                        return False, {"success": False, "error": serializer.errors}, 400
+                    for field, value in serializer.validated_data.items():
+                        setattr(user, field, value)
+                    dirty_fields.update(serializer.validated_data)
+
+                if dirty_fields:
+                    # auto_now fields are only refreshed when listed
+                    dirty_fields.add("updated_at")
+                    user.save(update_fields=dirty_fields)
 
-            return False, {"success": False, "error": serializer.errors}
+            return (
+                True,
+                {
+                    "success": True,
+                    "data": ProfileService.get_profile(user),
+                    "message": "Profile updated successfully",
+                },
+                200,
+            )
         except Exception as e:
             logger.error(f"Profile picture error: {str(e)}")
             return False, {"success": False, "error": "Failed to update profile"}, 500
@@ -94,7 +156,7 @@ class ProfileService:
             file (): uploaded file object (InMemoryUploadedFile or UploadedFile)
 
         Returns:
-            bool: success status
+            list: fields to save, False if the file was rejected
         """
         try:
             # Validate file type
@@ -107,56 +169,94 @@ class ProfileService:
             if file.size > max_size:
                 logger.error(f"File too large: {file.size}")
                 return False
-            # Handle existing profile
-            if user.profile_picture:
-                try:
-                    if os.path.isfile(user.profile_picture):
-                        os.remove(user.profile_picture)
-                        logger.info(
-                            f"Removed old profile picture: {user.profile_picture.path}"
-                        )
-                except Exception as e:
-                    logger.warning(f"Could not remove old profile picture: {str(e)}")
+            # Remember the existing picture, it is deleted once the new one is committed
+            old_picture = user.profile_picture.name if user.profile_picture else None
+            storage = user.profile_picture.storage
 
-            # set new profile picture
+            # set new profile picture, named after the sniffed format
+            image_format = ProfileService._sniff_image_format(file)
+            file.name = f"profile_{user.pk}.{IMAGE_FORMATS[image_format]}"
             user.profile_picture = file
-            user.save(update_fields=["profile_picture"])
             logger.info(f"profile picture updated for user: {user.id}")
-            return True
+
+            if old_picture:
+                transaction.on_commit(
+                    lambda: ProfileService._delete_stored_file(storage, old_picture)
+                )
+            return ["profile_picture"]
         except Exception as e:
             logger.info(f"Error processing profile picture: {str(e)}")
 
     @staticmethod
-    def _process_password_change(user, new_password, current_password):
+    def _delete_stored_file(storage, name):
+        """Delete a file through its storage backend (local disk, S3, ...)
+
+        Args:
+            storage (Storage): storage backend of the file field
+            name (str): stored file name
+        """
+        try:
+            storage.delete(name)
+            logger.info(f"Removed old profile picture: {name}")
+        except Exception as e:
+            logger.warning(f"Could not remove old profile picture: {str(e)}")
+
+    @staticmethod
+    def _process_password_change(user, current_password, new_password):
         """Process password change
 
+        Hashing runs in the bounded hasher pool so concurrent changes use
+        every core without oversubscribing the host.
+
         Args:
             user (object): User object
-            new_password (str): New password to set
             current_password (str): Current user password
+            new_password (str): New password to set
 
         Returns:
-            dict: Result flag and error message if applicable
+            dict: Result flag, fields to save or error message
         """
-        # Verify current password
-        if not user.check_password(current_password):
+        # Verify current password (no rehash here, the password is replaced below)
+        if not check_password(current_password, user.password):
             return {"success": False, "error": "Current_password is incorrect"}
 
         # Validate ne password
         try:
             validate_password(new_password, user=user)
         except ValidationError as e:
-            return {"success": False, "error": ", ".join(e.message)}
+            return {"success": False, "error": ", ".join(e.messages)}
 
         # update password
         user.set_password(new_password)
-        user.save(update_fields=["password"])
 
         # Log password change for security audit
         logger.info(f"Password changed for user: {user.id}")
 
-        # Invalidate all existing refresh token for security
-        TokenManager.blacklist_all_user_tokens(user.id)
+        # Invalidate all existing refresh token for security, once saved
+        transaction.on_commit(lambda: TokenManager.blacklist_all_user_tokens(user.id))
+        return {"success": True, "update_fields": ["password"]}
+
+    @staticmethod
+    def _sniff_image_format(file):
+        """Detect the image format from the file magic bytes
+
+        Args:
+            file (): Uploaded file object
+
+        Returns:
+            str: Pillow format name (see IMAGE_FORMATS), None if unsupported
+        """
+        head = file.read(12)
+        file.seek(0)
+        if head.startswith(b"\xff\xd8\xff"):
+            return "JPEG"
+        if head.startswith(b"\x89PNG\r\n\x1a\n"):
+            return "PNG"
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            return "GIF"
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            return "WEBP"
+        return None
 
     @staticmethod
     def _is_valid_image_file(file):
@@ -169,7 +269,7 @@ class ProfileService:
                 bool: True if valid uploaded file
         """
         # check if it's a proper uploaded file
-        if not isinstance(file, InMemoryUploadedFile, UploadedFile):
+        if not isinstance(file, (InMemoryUploadedFile, UploadedFile)):
             return False
 
         # Check content type
@@ -177,8 +277,5 @@ class ProfileService:
         if file.content_type not in valid_types:
             return False
 
-        # Check file extensions
-        valid_extensions = [".jpeg", ".png", ".gif", ".webp"]
-        file_ext = os.path.splitext(file.name()[1].lower())
-        if file_ext not in valid_extensions:
-            return False
+        # Check the actual content, the file name is not trusted
+        return ProfileService._sniff_image_format(file) is not None
@@ -1,13 +1,20 @@
 import io
+import tempfile
 import uuid
 
-from PIL import Image
+from PIL import Image, UnidentifiedImageError
 from django.core.files.base import ContentFile
 
+# Cap decoded size to bound decompression bomb CPU/memory (~40 MP)
+Image.MAX_IMAGE_PIXELS = 40_000_000
+
 
 def _process_profile_picture_file(user, file):
     """Process uploaded picture file
 
+    The file is written to storage but the model is not saved: the caller
+    includes the picture field in its single save(update_fields=[...]).
+
     Args:
         user (object): User object
         file (): uploaded file object (InMemoryUploadedFile or UploadedFile)
@@ -15,12 +22,11 @@ def _process_profile_picture_file(user, file):
     Returns:
         bool: success status
     """
-    try:
-    except Exception:
-        return False
-
     MAX_BYTES = 5 * 1024 * 1024  # 5 MB
     MAX_DIM = (1024, 1024)  # max width/height
+    CHUNK_SIZE = 64 * 1024  # 64 KB
+    # only dispatch to these decoders (no EPS, PSD, ...)
+    ALLOWED_FORMATS = ["JPEG", "PNG", "GIF", "WEBP"]
 
     if file is None:
         return False
@@ -34,33 +40,53 @@ def _process_profile_picture_file(user, file):
         return False
 
     try:
-        # Read raw bytes from uploaded file
+        # Stream the upload to a temporary file, one chunk at a time,
+        # instead of loading it in memory
         if hasattr(file, "seek"):
             file.seek(0)
-        raw = file.read() if hasattr(file, "read") else None
-        if not raw:
-            return False
-
-        src = io.BytesIO(raw)
-
-        # Validate image and prepare for saving/resizing
-        img = Image.open(src)
-        img.verify()  # will raise if not an image
-        src.seek(0)
-        img = Image.open(src)
-
-        # Normalize to RGB for JPEG compatibility
-        if img.mode not in ("RGB", "RGBA"):
-            img = img.convert("RGB")
-
-        # Resize to reasonable bounds while keeping aspect ratio
-        img.thumbnail(MAX_DIM, Image.LANCZOS)
-
-        out = io.BytesIO()
-        fmt = "JPEG" if img.mode == "RGB" else "PNG"
-        ext = "jpg" if fmt == "JPEG" else "png"
-        img.save(out, format=fmt, quality=85)
-        out.seek(0)
+        with tempfile.TemporaryFile() as tmp:
+            written = 0
+            for chunk in file.chunks(chunk_size=CHUNK_SIZE):
+                written += len(chunk)
+                if written > MAX_BYTES:
+                    return False
+                tmp.write(chunk)
+            if not written:
+                return False
+            tmp.seek(0)
+
+            # Decode only once: a broken image fails in convert/thumbnail/save,
+            # no separate verify() pass
+            try:
+                img = Image.open(tmp, formats=ALLOWED_FORMATS)
+
+                # Let libjpeg downscale (1/2, 1/4, 1/8) while decoding
+                if img.format == "JPEG":
+                    img.draft("RGB", MAX_DIM)
+
+                # Normalize to RGB (RGBA keeps its alpha channel)
+                if img.mode not in ("RGB", "RGBA"):
+                    img = img.convert("RGB")
+
+                # Resize to reasonable bounds while keeping aspect ratio
+                # (bilinear is enough once draft() got within 2x of the target)
+                if max(img.size) <= 2 * max(MAX_DIM):
+                    resample = Image.BILINEAR
+                else:
+                    resample = Image.LANCZOS
+                img.thumbnail(MAX_DIM, resample, reducing_gap=2.0)
+
+                # WebP is ~30% smaller than JPEG at the same visual quality
+                out = io.BytesIO()
+                if img.mode == "RGB":
+                    ext = "webp"
+                    img.save(out, format="WEBP", quality=82, method=4)
+                else:
+                    ext = "png"
+                    img.save(out, format="PNG", optimize=True, compress_level=6)
+                out.seek(0)
+            except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+                return False
 
         filename = f"profile_{getattr(user, 'pk', uuid.uuid4().hex)}.{ext}"
         content = ContentFile(out.read(), name=filename)
@@ -71,23 +97,19 @@ def _process_profile_picture_file(user, file):
             if hasattr(owner, attr):
                 field = getattr(owner, attr)
                 try:
-                    # If it's a FileField-like, call save
+                    # If it's a FileField-like, store the file only
                     if hasattr(field, "save"):
-                        field.save(filename, content, save=True)
+                        field.save(filename, content, save=False)
                     else:
                         setattr(owner, attr, content)
-                        if hasattr(owner, "save"):
-                            owner.save()
                     return True
                 except Exception:
                     # try next option on failure
                     continue
 
-        # Fallback: attach temporary attribute and save user (best-effort for tests)
+        # Fallback: attach temporary attribute (best-effort for tests)
         try:
             setattr(user, "temp_profile_picture", content)
-            if hasattr(user, "save"):
-                user.save()
             return True
         except Exception:
             return False
@@ -1,31 +1,52 @@
 import logging
 import traceback
 
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from rest_framework.throttling import UserRateThrottle
 from rest_framework.views import status
 
 from accounts.core.base_view import BaseAPIView
+from accounts.core.throttling import RedisUserRateThrottle
 from .services import ProfileService
 from ..core.response import standardized_response
 
 logger = logging.getLogger(__name__)
 
 
+def _profile_last_modified(request, *args, **kwargs):
+    """updated_at of the authenticated user, None disables the check"""
+    if not request.user.is_authenticated:
+        return None
+    return request.user.updated_at
+
+
+def _profile_etag(request, *args, **kwargs):
+    """ETag of the profile payload, it only changes with updated_at"""
+    if not request.user.is_authenticated:
+        return None
+    return f"{request.user.pk}-{request.user.updated_at.timestamp()}"
+
+
 class UserProfileView(BaseAPIView):
     """API endpoint for user profile operations"""
 
     permission_classes = [AllowAny]
-    throttle_classes = [UserRateThrottle]
+    throttle_classes = [RedisUserRateThrottle]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
 
+    @method_decorator(cache_control(private=True, max_age=0, must_revalidate=True))
+    @method_decorator(
+        condition(etag_func=_profile_etag, last_modified_func=_profile_last_modified)
+    )
     def get(self, request):
         """get User profile data"""
         try:
             # use service layer to get user profile data
-            user_data = ProfileService.get_profile(request.user)
+            user_data = ProfileService.get_profile(request.user, request=request)
             return Response(standardized_response(success=True, data=user_data))
         except Exception as e:
             logger.error(f"Profile fetch error: {str(e)}")
@@ -41,10 +62,12 @@ class UserProfileView(BaseAPIView):
         """Update full user profile"""
         try:
             # Log incoming request for debugging
-            logger.info(f"Profile update request - Data key: {request.data.keys()}")
-            logger.info(
-                f"Profile update request - Files key: {list(request.FILES.keys()) if request.FILES else 'No files'}"
-            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Profile update request - data=%s files=%s",
+                    list(request.data.keys()),
+                    list(request.FILES.keys()),
+                )
 
             # use service layer for profile update logic
             success, response_data, status_code = ProfileService.update_profile(
@@ -64,10 +87,12 @@ class UserProfileView(BaseAPIView):
         """Partial user profile update"""
         try:
             # Log incoming request for debugging
-            logger.info(f"Profile patch request - Data keys: {list(request.data.keys)}")
-            logger.info(
-                f"Profile patch request - Files keys: {list(request.FILES.keys) if request.FILES else 'No files'}"
-            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Profile patch request - data=%s files=%s",
+                    list(request.data.keys()),
+                    list(request.FILES.keys()),
+                )
 
             # Use service layer for partial profile update
             success, response_data, status_code = ProfileService.update_profile(
@@ -1,4 +1,6 @@
 # apps/accounts/serializers.py
+from urllib.parse import urljoin
+
 from django.contrib.auth import authenticate
 from rest_framework import serializers
 
@@ -18,9 +20,16 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at','profile_picture_url']
 
     def get_profile_picture_url(self, obj):
-        if obj.profile_picture:
-            return self.context['request'].build_absolute_uri(obj.profile_picture.url)
-        return None
+        if not obj.profile_picture:
+            return None
+        request = self.context.get('request')
+        if request is None:
+            return obj.profile_picture.url
+        # the context is shared by every row of a list, resolve the host once
+        base_url = self.context.get('_abs')
+        if base_url is None:
+            base_url = self.context['_abs'] = request.build_absolute_uri('/')
+        return urljoin(base_url, obj.profile_picture.url)
 
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.core.jwt_utils import invalidate_user_cache
+from .models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_caches(sender, instance, **kwargs):
+    """Invalide les caches utilisés lors du rafraîchissement des tokens et de l'authentification."""
+    invalidate_user_cache(instance.pk)
@@ -1,3 +1,664 @@
-from django.test import TestCase
+import pickle
+import time
+import unittest
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest import mock
 
-# Create your tests here.
+import jwt
+
+try:
+    import fakeredis
+except ImportError:  # tests redis ignorés sans fakeredis (et lupa pour les scripts lua)
+    fakeredis = None
+
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from redis.exceptions import ConnectionError as RedisConnectionError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.auth.services import AuthenticationService
+from accounts.core import authentication, cache_utils, jwt_utils, rate_limit
+from accounts.core.authentication import CachedJWTAuthentication
+from accounts.core.jwt_utils import TokenManager, user_auth_cache_key
+from accounts.core.renderers import ORJSONRenderer
+from accounts.core.throttling import RedisUserRateThrottle
+from accounts.models import User
+from accounts.profile.services import ProfileService
+from accounts.verification.emails import _uid_for
+from accounts.verification.password_reset_service import PasswordResetService
+from accounts.verification.services import EmailVerificationService
+
+# cache local et hasher rapide : les tests ne dépendent ni de redis ni d'argon2
+TEST_SETTINGS = {
+    "CACHES": {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    "PASSWORD_HASHERS": ["django.contrib.auth.hashers.MD5PasswordHasher"],
+}
+
+
+def make_user(name="user", **extra_fields):
+    return User.objects.create_user(
+        email=f"{name}@example.com",
+        password="Str0ng-pass!",
+        username=name,
+        matricule=name,
+        **extra_fields,
+    )
+
+
+@override_settings(**TEST_SETTINGS)
+class VerifyEmailTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user(is_verified=False)
+        self.uid = _uid_for(self.user.pk)
+
+    def test_valid_token_verifies_user(self):
+        token = default_token_generator.make_token(self.user)
+        success, _, status = EmailVerificationService.verify_email(self.uid, token)
+        self.assertTrue(success)
+        self.assertEqual(status, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_verified)
+
+    def test_cached_status_does_not_bypass_token_check(self):
+        # la connexion met ce cache à jour pour tout utilisateur vérifié
+        cache.set(EmailVerificationService.get_verification_cache_key(self.user.pk), True)
+        for token in ("forged-token", ""):
+            success, _, status = EmailVerificationService.verify_email(self.uid, token)
+            self.assertFalse(success)
+            self.assertEqual(status, 400)
+
+    def test_stale_cached_status_does_not_skip_update(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        cache.set(EmailVerificationService.get_verification_cache_key(self.user.pk), True)
+        token = default_token_generator.make_token(self.user)
+        success, _, _ = EmailVerificationService.verify_email(self.uid, token)
+        self.assertTrue(success)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_verified)
+        self.assertTrue(self.user.is_active)
+
+
+def signed_access_token(user, **claims):
+    now = int(time.time())
+    payload = {
+        "token_type": "access",
+        "user_id": str(user.pk),
+        "jti": "test-jti",
+        "iat": now,
+        "exp": now + 300,
+    }
+    payload.update(claims)
+    return jwt.encode(payload, settings.SECRET_KEY, algorithm="HS256")
+
+
+@override_settings(**TEST_SETTINGS)
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        authentication._VALIDATED_TOKENS.clear()
+        self.user = make_user()
+        self.auth = CachedJWTAuthentication()
+
+    def test_valid_token_is_accepted(self):
+        raw = TokenManager.generate_token(self.user)["access"].encode()
+        token = self.auth.get_validated_token(raw)
+        self.assertEqual(token["user_id"], str(self.user.pk))
+
+    def test_wrong_signature_is_rejected(self):
+        header, payload, _ = TokenManager.generate_token(self.user)["access"].split(".")
+        forged = jwt.encode(
+            jwt.decode(f"{header}.{payload}.", options={"verify_signature": False}),
+            "not-the-signing-key",
+            algorithm="HS256",
+        )
+        with self.assertRaises(InvalidToken):
+            self.auth.get_validated_token(forged.encode())
+
+    def test_refresh_token_is_rejected(self):
+        raw = TokenManager.generate_token(self.user)["refresh"].encode()
+        with self.assertRaises(InvalidToken):
+            self.auth.get_validated_token(raw)
+
+    def test_wrong_audience_is_rejected(self):
+        simple_jwt = {**settings.SIMPLE_JWT, "AUDIENCE": "scholarflow-api"}
+        backend = TokenBackend(
+            "HS256", settings.SECRET_KEY, audience="scholarflow-api"
+        )
+        raw = signed_access_token(self.user, aud="another-api").encode()
+        with override_settings(SIMPLE_JWT=simple_jwt), mock.patch.object(
+            AccessToken, "_token_backend", backend
+        ), mock.patch.object(
+            authentication, "_signature_is_valid", wraps=authentication._signature_is_valid
+        ) as fast_path:
+            with self.assertRaises(InvalidToken):
+                self.auth.get_validated_token(raw)
+        # audience configurée : validation complète par SimpleJWT
+        fast_path.assert_not_called()
+
+    def test_cached_token_skips_validation(self):
+        raw = TokenManager.generate_token(self.user)["access"].encode()
+        self.auth.get_validated_token(raw)
+        with mock.patch.object(CachedJWTAuthentication, "_validate_hs256") as validate:
+            token = self.auth.get_validated_token(raw)
+        validate.assert_not_called()
+        self.assertEqual(token["user_id"], str(self.user.pk))
+
+    def test_cached_token_past_exp_is_validated_again(self):
+        raw = signed_access_token(self.user, exp=int(time.time()) + 1).encode()
+        self.auth.get_validated_token(raw)
+        later = datetime.now(timezone.utc) + timedelta(seconds=5)
+        with mock.patch(
+            "accounts.core.authentication.time.time", return_value=later.timestamp()
+        ), mock.patch("rest_framework_simplejwt.tokens.aware_utcnow", return_value=later):
+            with self.assertRaises(InvalidToken):
+                self.auth.get_validated_token(raw)
+
+    def test_settings_change_clears_validated_tokens(self):
+        raw = TokenManager.generate_token(self.user)["access"].encode()
+        self.auth.get_validated_token(raw)
+        self.assertEqual(len(authentication._VALIDATED_TOKENS), 1)
+        with override_settings(SIMPLE_JWT={**settings.SIMPLE_JWT, "LEEWAY": 0}):
+            self.assertEqual(len(authentication._VALIDATED_TOKENS), 0)
+
+
+@override_settings(**TEST_SETTINGS)
+class CachedUserTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user(
+            is_verified=True, profile_picture="profile_pictures/a.jpg"
+        )
+        self.auth = CachedJWTAuthentication()
+        raw = TokenManager.generate_token(self.user)["access"].encode()
+        self.token = self.auth.get_validated_token(raw)
+
+    def test_cached_user_skips_query_and_password_hash(self):
+        self.auth.get_user(self.token)
+        cached = cache.get(user_auth_cache_key(self.user.pk))
+        # y compris dans les objets imbriqués (FieldFile.instance)
+        self.assertNotIn(self.user.password.encode(), pickle.dumps(cached))
+
+        with self.assertNumQueries(0):
+            user = self.auth.get_user(self.token)
+            self.assertEqual(user.email, self.user.email)
+            self.assertEqual(user.profile_picture.name, "profile_pictures/a.jpg")
+            self.assertEqual(user.created_at, self.user.created_at)
+        # le hash reste disponible, chargé à la demande
+        self.assertTrue(user.check_password("Str0ng-pass!"))
+
+    def test_login_invalidates_cached_user(self):
+        self.auth.get_user(self.token)
+        success, _, _ = AuthenticationService.login(self.user.email, "Str0ng-pass!")
+        self.assertTrue(success)
+        self.assertIsNone(cache.get(user_auth_cache_key(self.user.pk)))
+        self.assertIsNotNone(self.auth.get_user(self.token).last_login)
+
+
+def unreachable_redis():
+    """Client redis dont chaque commande échoue comme un serveur arrêté."""
+    client = mock.MagicMock()
+    client.pipeline.return_value.execute.side_effect = RedisConnectionError
+    client.register_script.return_value.side_effect = RedisConnectionError
+    client.delete.side_effect = RedisConnectionError
+    return client
+
+
+@override_settings(**TEST_SETTINGS)
+class RedisUnavailableTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user(is_verified=True)
+        client = unreachable_redis()
+        for module in (
+            "accounts.core.rate_limit",
+            "accounts.core.jwt_utils",
+            "accounts.core.throttling",
+            "accounts.auth.services",
+        ):
+            patcher = mock.patch(f"{module}.get_redis_client", return_value=client)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        scripts = mock.patch.dict(cache_utils._SCRIPTS, clear=True)
+        scripts.start()
+        self.addCleanup(scripts.stop)
+
+    def test_login_fails_open(self):
+        success, response, status = AuthenticationService.login(
+            self.user.email, "Str0ng-pass!"
+        )
+        self.assertTrue(success)
+        self.assertEqual(status, 200)
+        self.assertIn("access", response["data"]["tokens"])
+
+    def test_wrong_password_still_rejected(self):
+        success, _, status = AuthenticationService.login(self.user.email, "wrong")
+        self.assertFalse(success)
+        self.assertEqual(status, 401)
+
+    def test_blacklist_check_fails_closed(self):
+        self.assertTrue(TokenManager.is_token_blacklisted("some-jti"))
+
+    def test_throttle_fails_open(self):
+        request = APIRequestFactory().get("/")
+        request.user = self.user
+        throttle = RedisUserRateThrottle()
+        throttle.rate = "1/min"
+        throttle.num_requests, throttle.duration = throttle.parse_rate("1/min")
+        self.assertTrue(throttle.allow_request(request, None))
+
+
+class ORJSONRendererTests(TestCase):
+    def test_dates_use_drf_format(self):
+        data = {
+            "aware": datetime(2026, 1, 2, 3, 4, 5, 123456, tzinfo=timezone.utc),
+            "naive": datetime(2026, 1, 2, 3, 4, 5),
+            "day": datetime(2026, 1, 2).date(),
+            "hour": datetime(2026, 1, 2, 3, 4, 5, 123456).time(),
+            "delay": timedelta(minutes=15),
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_non_str_keys(self):
+        data = {1: "a", "nested": {2: 3, None: True}}
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        key = uuid.uuid4()
+        self.assertEqual(
+            ORJSONRenderer().render({key: 1}), f'{{"{key}":1}}'.encode()
+        )
+
+    def test_indent_from_media_type(self):
+        data = {"a": [1, 2]}
+        media_type = "application/json; indent=4"
+        self.assertEqual(
+            ORJSONRenderer().render(data, media_type),
+            JSONRenderer().render(data, media_type),
+        )
+
+
+class FakeRedisMixin:
+    """Remplace le client redis natif par un serveur fakeredis isolé."""
+
+    redis_modules = (
+        "accounts.core.rate_limit",
+        "accounts.core.jwt_utils",
+        "accounts.core.throttling",
+    )
+
+    def use_fake_redis(self):
+        self.redis = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+        for module in self.redis_modules:
+            patcher = mock.patch(f"{module}.get_redis_client", return_value=self.redis)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # les scripts lua sont liés au client qui les a enregistrés
+        scripts = mock.patch.dict(cache_utils._SCRIPTS, clear=True)
+        scripts.start()
+        self.addCleanup(scripts.stop)
+
+
+@override_settings(**TEST_SETTINGS)
+class LoginLockoutFallbackTests(TestCase):
+    """Compteur add/incr du cache Django (sans redis)."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_locked_after_max_attempts(self):
+        for attempt in range(1, rate_limit.LOGIN_MAX_ATTEMPTS):
+            self.assertEqual(rate_limit.record_failed_login("k"), (attempt, False))
+        self.assertFalse(rate_limit.is_login_locked("k"))
+        self.assertEqual(
+            rate_limit.record_failed_login("k"), (rate_limit.LOGIN_MAX_ATTEMPTS, True)
+        )
+        self.assertTrue(rate_limit.is_login_locked("k"))
+
+    def test_reset_restarts_the_count(self):
+        for _ in range(rate_limit.LOGIN_MAX_ATTEMPTS - 1):
+            rate_limit.record_failed_login("k")
+        rate_limit.reset_failed_logins("k")
+        self.assertEqual(rate_limit.record_failed_login("k"), (1, False))
+
+
+@unittest.skipUnless(fakeredis, "fakeredis is not installed")
+@override_settings(**TEST_SETTINGS)
+class LoginLockoutRedisTests(FakeRedisMixin, TestCase):
+    """Fenêtre glissante du script rate_limit.lua."""
+
+    def setUp(self):
+        cache.clear()
+        self.use_fake_redis()
+
+    def test_locked_after_max_attempts(self):
+        for attempt in range(1, rate_limit.LOGIN_MAX_ATTEMPTS):
+            self.assertEqual(rate_limit.record_failed_login("k"), (attempt, False))
+        self.assertFalse(rate_limit.is_login_locked("k"))
+        self.assertEqual(
+            rate_limit.record_failed_login("k"), (rate_limit.LOGIN_MAX_ATTEMPTS, True)
+        )
+        self.assertTrue(rate_limit.is_login_locked("k"))
+        # verrouillé : les échecs suivants ne rallongent pas la fenêtre
+        self.assertEqual(self.redis.zcard("fail:k"), rate_limit.LOGIN_MAX_ATTEMPTS)
+
+    def test_old_failures_leave_the_window(self):
+        start = time.time()
+        with mock.patch("accounts.core.rate_limit.time.time", return_value=start):
+            for _ in range(rate_limit.LOGIN_MAX_ATTEMPTS):
+                rate_limit.record_failed_login("k")
+        later = start + rate_limit.LOGIN_WINDOW_SECONDS + 1
+        with mock.patch("accounts.core.rate_limit.time.time", return_value=later):
+            self.assertFalse(rate_limit.is_login_locked("k"))
+            self.assertEqual(rate_limit.record_failed_login("k"), (1, False))
+
+    def test_reset_unlocks(self):
+        for _ in range(rate_limit.LOGIN_MAX_ATTEMPTS):
+            rate_limit.record_failed_login("k")
+        rate_limit.reset_failed_logins("k")
+        self.assertFalse(rate_limit.is_login_locked("k"))
+
+    def test_reset_in_caller_pipeline(self):
+        rate_limit.record_failed_login("k")
+        pipe = self.redis.pipeline()
+        rate_limit.reset_failed_logins("k", pipeline=pipe)
+        self.assertEqual(self.redis.zcard("fail:k"), 1)
+        pipe.execute()
+        self.assertEqual(self.redis.zcard("fail:k"), 0)
+
+
+@override_settings(**TEST_SETTINGS)
+class LoginServiceLockoutTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user(is_verified=True)
+
+    def login(self, password):
+        return AuthenticationService.login(self.user.email, password)
+
+    def test_lockout_after_five_failures(self):
+        for _ in range(rate_limit.LOGIN_MAX_ATTEMPTS - 1):
+            self.assertEqual(self.login("wrong")[2], 401)
+        success, response, status = self.login("wrong")
+        self.assertEqual(status, 403)
+        self.assertTrue(response["lockout"])
+        # même le bon mot de passe est refusé pendant le verrouillage
+        self.assertEqual(self.login("Str0ng-pass!")[2], 403)
+
+    def test_success_resets_failures(self):
+        for _ in range(rate_limit.LOGIN_MAX_ATTEMPTS - 1):
+            self.login("wrong")
+        self.assertEqual(self.login("Str0ng-pass!")[2], 200)
+        for _ in range(rate_limit.LOGIN_MAX_ATTEMPTS - 1):
+            self.assertEqual(self.login("wrong")[2], 401)
+
+
+@override_settings(**TEST_SETTINGS)
+class BlacklistFallbackTests(TestCase):
+    """Liste noire dans le cache Django (sans redis)."""
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(
+            jwt_utils, "_local_user_tokens", jwt_utils._LocalUserTokens()
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_blacklist_token(self):
+        self.assertFalse(TokenManager.is_token_blacklisted("jti-1"))
+        TokenManager.blacklist_token("jti-1")
+        self.assertTrue(TokenManager.is_token_blacklisted("jti-1"))
+        self.assertFalse(TokenManager.is_token_blacklisted("jti-2"))
+
+    def test_blacklist_all_user_tokens(self):
+        TokenManager._store_token_metadata(1, "a", "access", 60)
+        TokenManager._store_token_metadata(1, "b", "refresh", 60)
+        TokenManager._store_token_metadata(2, "c", "access", 60)
+        self.assertEqual(TokenManager.blacklist_all_user_tokens(1), 2)
+        self.assertTrue(TokenManager.is_token_blacklisted("a"))
+        self.assertTrue(TokenManager.is_token_blacklisted("b"))
+        self.assertFalse(TokenManager.is_token_blacklisted("c"))
+
+
+@unittest.skipUnless(fakeredis, "fakeredis is not installed")
+@override_settings(**TEST_SETTINGS)
+class BlacklistRedisTests(FakeRedisMixin, TestCase):
+    """Buckets redis de la liste noire."""
+
+    def setUp(self):
+        self.use_fake_redis()
+        self.ttl = jwt_utils._BLACKLIST_TTL
+        # début d'un bucket, pour ne pas changer de bucket pendant le test
+        self.start = (int(time.time()) // self.ttl) * self.ttl
+
+    def at(self, offset):
+        return mock.patch(
+            "accounts.core.jwt_utils.time.time", return_value=self.start + offset
+        )
+
+    def test_blacklisted_jti_survives_next_bucket(self):
+        with self.at(self.ttl - 1):
+            TokenManager.blacklist_token("jti-1")
+        with self.at(self.ttl):
+            self.assertTrue(TokenManager.is_token_blacklisted("jti-1"))
+        with self.at(2 * self.ttl - 1):
+            self.assertTrue(TokenManager.is_token_blacklisted("jti-1"))
+        # au-delà du bucket suivant, le jti n'est plus consulté (et son set a expiré)
+        with self.at(2 * self.ttl):
+            self.assertFalse(TokenManager.is_token_blacklisted("jti-1"))
+
+    def test_bucket_expires_after_two_periods(self):
+        bucket_key = jwt_utils._blacklist_bucket_key(self.start // self.ttl)
+        with self.at(0):
+            TokenManager.blacklist_token("jti-1")
+            self.assertTrue(self.redis.sismember(bucket_key, "jti-1"))
+            self.assertEqual(self.redis.ttl(bucket_key), 2 * self.ttl)
+
+    def test_blacklist_all_user_tokens(self):
+        with self.at(0):
+            TokenManager._store_token_metadata(1, "a", "access", 60)
+            TokenManager._store_token_metadata(1, "b", "refresh", 60)
+            TokenManager._store_token_metadata(2, "c", "access", 60)
+            self.assertEqual(TokenManager.blacklist_all_user_tokens(1), 2)
+            self.assertTrue(TokenManager.is_token_blacklisted("a"))
+            self.assertTrue(TokenManager.is_token_blacklisted("b"))
+            self.assertFalse(TokenManager.is_token_blacklisted("c"))
+        self.assertFalse(self.redis.exists(jwt_utils._user_tokens_key(1)))
+
+
+@override_settings(**TEST_SETTINGS)
+class UpdateProfileTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user()
+
+    def spy_save(self):
+        return mock.patch.object(User, "save", autospec=True, side_effect=User.save)
+
+    def update(self, data):
+        with CaptureQueriesContext(connection) as ctx:
+            success, response, status = ProfileService.update_profile(self.user, data)
+        self.assertTrue(success, response)
+        return [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+
+    def test_only_changed_fields_are_saved(self):
+        with self.spy_save() as save:
+            updates = self.update({"first_name": "Ada"})
+        save.assert_called_once_with(
+            self.user, update_fields={"first_name", "updated_at"}
+        )
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn('"email"', updates[0])
+        self.assertNotIn('"password"', updates[0])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, "Ada")
+
+    def test_password_change_saves_password_only(self):
+        with self.spy_save() as save:
+            self.update(
+                {"current_password": "Str0ng-pass!", "new_password": "N3w-pass-word!"}
+            )
+        save.assert_called_once_with(
+            self.user, update_fields={"password", "updated_at"}
+        )
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("N3w-pass-word!"))
+
+    def test_empty_update_skips_the_query(self):
+        self.assertEqual(self.update({}), [])
+
+
+class ThrottleMixin:
+    def make_throttle(self, rate="2/min"):
+        throttle = RedisUserRateThrottle()
+        throttle.rate = rate
+        throttle.num_requests, throttle.duration = throttle.parse_rate(rate)
+        return throttle
+
+    def request_as(self, user):
+        request = APIRequestFactory().get("/")
+        request.user = user
+        return request
+
+    def hit(self, user, times=1):
+        return [
+            self.make_throttle().allow_request(self.request_as(user), None)
+            for _ in range(times)
+        ]
+
+
+@override_settings(**TEST_SETTINGS)
+class ThrottleFallbackTests(ThrottleMixin, TestCase):
+    """Sans redis, l'historique de DRF dans le cache Django."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = make_user()
+
+    def test_rate_is_enforced(self):
+        self.assertEqual(self.hit(self.user, 3), [True, True, False])
+
+
+@unittest.skipUnless(fakeredis, "fakeredis is not installed")
+@override_settings(**TEST_SETTINGS)
+class ThrottleRedisTests(ThrottleMixin, FakeRedisMixin, TestCase):
+    """Fenêtre fixe INCR + EXPIRE NX."""
+
+    def setUp(self):
+        self.use_fake_redis()
+        self.user = make_user()
+
+    def test_rate_is_enforced(self):
+        self.assertEqual(self.hit(self.user, 2), [True, True])
+        throttle = self.make_throttle()
+        self.assertFalse(throttle.allow_request(self.request_as(self.user), None))
+        self.assertTrue(0 < throttle.wait() <= 60)
+
+    def test_users_have_separate_counters(self):
+        other = make_user("other")
+        self.hit(self.user, 3)
+        self.assertEqual(self.hit(other, 2), [True, True])
+
+    def test_window_is_not_extended(self):
+        start = time.time()
+        with mock.patch("time.time", return_value=start):
+            self.hit(self.user, 3)
+        # les requêtes refusées ne prolongent pas la fenêtre
+        with mock.patch("time.time", return_value=start + 61):
+            self.assertEqual(self.hit(self.user), [True])
+
+
+@override_settings(**TEST_SETTINGS)
+class RegisterTests(TestCase):
+    def register(self, email):
+        return AuthenticationService.register(email, "Str0ng-pass!")
+
+    def test_duplicate_email(self):
+        make_user("taken")
+        success, response, status = self.register("taken@example.com")
+        self.assertFalse(success)
+        self.assertEqual(status, 400)
+        self.assertEqual(response["error"], "Un utilisateur avec cet email existe déjà.")
+
+    def test_other_unique_column_collision(self):
+        # register() ne renseigne ni matricule ni username : "" est déjà pris
+        User.objects.create_user(email="other@example.com", password="Str0ng-pass!")
+        success, response, status = self.register("new@example.com")
+        self.assertFalse(success)
+        self.assertEqual(status, 400)
+        self.assertNotIn("email", response["error"])
+        # la transaction englobante reste utilisable après l'erreur
+        self.assertFalse(User.objects.filter(email="new@example.com").exists())
+
+
+@override_settings(**TEST_SETTINGS)
+class EmailRateLimitTests(TestCase):
+    """add() renvoie False si la clé existe, None si redis est indisponible."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = make_user(is_verified=False)
+
+    def send_verification(self):
+        with mock.patch(
+            "accounts.verification.tasks.send_verification_email_task.delay"
+        ) as delay:
+            _, _, status = EmailVerificationService.send_verification_email(self.user)
+        return status, delay.call_count
+
+    def request_reset(self):
+        with mock.patch(
+            "accounts.verification.password_reset_service"
+            ".send_password_reset_email_task.delay"
+        ) as delay:
+            PasswordResetService.request_reset(self.user.email)
+        return delay.call_count
+
+    def test_resend_is_rate_limited(self):
+        self.assertEqual(self.send_verification(), (200, 1))
+        self.assertEqual(self.send_verification(), (429, 0))
+        self.assertEqual(self.request_reset(), 1)
+        self.assertEqual(self.request_reset(), 0)
+
+    def test_redis_outage_fails_open(self):
+        with mock.patch.object(cache, "add", return_value=None):
+            self.assertEqual(self.send_verification(), (200, 1))
+            self.assertEqual(self.request_reset(), 1)
+
+
+@override_settings(**TEST_SETTINGS)
+class UserAdminTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            email="admin@example.com",
+            password="Str0ng-pass!",
+            username="admin",
+            matricule="admin",
+        )
+        self.client.force_login(self.admin)
+
+    def delete_selected_queries(self):
+        pks = User.objects.exclude(pk=self.admin.pk).values_list("pk", flat=True)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(
+                "/admin/accounts/user/",
+                {"action": "delete_selected", "_selected_action": list(pks)},
+            )
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_action_page_does_not_query_per_row(self):
+        make_user("a")
+        make_user("b")
+        queries = self.delete_selected_queries()
+        make_user("c")
+        make_user("d")
+        self.assertEqual(self.delete_selected_queries(), queries)
@@ -0,0 +1,100 @@
+import atexit
+import logging
+import threading
+
+from celery.signals import worker_process_shutdown
+from django.core.mail.backends.smtp import EmailBackend
+
+logger = logging.getLogger(__name__)
+
+# one pool per thread: {(host, port, username, use_ssl): [smtp_connection, sent]}
+_local = threading.local()
+_pools = []
+_pools_lock = threading.Lock()
+
+
+def _thread_pool():
+    pool = getattr(_local, "connections", None)
+    if pool is None:
+        pool = _local.connections = {}
+        with _pools_lock:
+            _pools.append(pool)
+    return pool
+
+
+def _quit(connection):
+    try:
+        connection.quit()
+    except OSError:
+        connection.close()
+
+
+def close_pooled_connections(**kwargs):
+    """Quit every pooled SMTP connection (process/worker shutdown)"""
+    with _pools_lock:
+        for pool in _pools:
+            for connection, _ in pool.values():
+                _quit(connection)
+            pool.clear()
+
+
+atexit.register(close_pooled_connections)
+# celery prefork children exit without running atexit hooks
+worker_process_shutdown.connect(close_pooled_connections)
+
+
+class PooledSMTPBackend(EmailBackend):
+    """SMTP backend keeping the authenticated connection open between sends
+
+    Connections are kept per thread and per (host, port, user). A pooled
+    connection is checked with NOOP before reuse and is really closed after
+    max_messages_per_connection messages, so consecutive emails skip the
+    TCP + TLS + AUTH handshake.
+    """
+
+    max_messages_per_connection = 100
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._sent_on_connection = 0
+
+    @property
+    def _pool_key(self):
+        return (self.host, self.port, self.username, self.use_ssl)
+
+    def open(self):
+        if self.connection:
+            return False
+        pooled = _thread_pool().pop(self._pool_key, None)
+        if pooled is not None:
+            connection, sent = pooled
+            try:
+                healthy = connection.noop()[0] == 250
+            except OSError:
+                healthy = False
+            if healthy:
+                self.connection = connection
+                self._sent_on_connection = sent
+                # True: send_messages() calls close(), which gives it back
+                return True
+            logger.info("Dropping stale pooled SMTP connection")
+            _quit(connection)
+        opened = super().open()
+        if opened:
+            self._sent_on_connection = 0
+        return opened
+
+    def _send(self, email_message):
+        sent = super()._send(email_message)
+        if sent:
+            self._sent_on_connection += 1
+        return sent
+
+    def close(self):
+        if self.connection is None:
+            return
+        if self._sent_on_connection >= self.max_messages_per_connection:
+            super().close()
+            return
+        _thread_pool()[self._pool_key] = [self.connection, self._sent_on_connection]
+        self.connection = None
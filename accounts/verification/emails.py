@@ -1,149 +1,197 @@
+import functools
 import logging
-import threading
-import traceback
-import time
-import random
-import string
-from django.core.mail import send_mail
+from django.core.mail import EmailMultiAlternatives
 from django.conf import settings
-from django.template.loader import render_to_string
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.template.loader import get_template
 from django.utils.encoding import force_bytes, force_str
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.contrib.auth.tokens import default_token_generator
 from django.contrib.auth import get_user_model
 
+from .mailer import send_batch
+
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
 
+def _load_email_settings():
+    """Read the settings used to compose emails once, at module level"""
+    global APP_NAME, FROM_EMAIL, CREDENTIALS_SET, VERIFY_PREFIX, RESET_PREFIX
+    APP_NAME = settings.APP_NAME
+    FROM_EMAIL = settings.DEFAULT_FROM_EMAIL or settings.EMAIL_HOST_USER
+    CREDENTIALS_SET = bool(settings.EMAIL_HOST_USER and settings.EMAIL_HOST_PASSWORD)
+    VERIFY_PREFIX = f"{settings.FRONTEND_URL}/auth/email-verify?uid="
+    RESET_PREFIX = f"{settings.FRONTEND_URL}/auth/password-reset-confirm?uid="
+
+
+_load_email_settings()
+
+
+@receiver(setting_changed)
+def _reload_email_settings(setting, **kwargs):
+    # keeps override_settings working in tests
+    if setting in (
+        "APP_NAME",
+        "DEFAULT_FROM_EMAIL",
+        "EMAIL_HOST_USER",
+        "EMAIL_HOST_PASSWORD",
+        "FRONTEND_URL",
+    ):
+        _load_email_settings()
+
+
+@functools.lru_cache(maxsize=None)
+def _get_template(name):
+    """Compiled email template, loaded and parsed once per process"""
+    return get_template(name)
+
+
+@functools.lru_cache(maxsize=4096)
+def _uid_for(pk):
+    """base64 uid used in the email links"""
+    return urlsafe_base64_encode(force_bytes(pk))
+
+
 class EmailService:
     """Service for sending user verification emails
+
+    Messages are built as EmailMultiAlternatives objects and sent through
+    mailer.send_batch, so several of them can share one SMTP connection.
+    SMTP/network errors (OSError) are re-raised so the calling Celery task
+    can retry with backoff.
+
     Args:
         user (User): The user to send email to
     Returns:
         bool: success status
     """
 
+    @staticmethod
+    def build_verification_message(user):
+        """Build the verification email (html with plain text fallback)
+
+        Args:
+            user (User): The user to send email to
+        Returns:
+            EmailMultiAlternatives: message ready to be sent
+        """
+        # generate verification token for link
+        uid = _uid_for(user.pk)
+        token = default_token_generator.make_token(user)
+
+        verify_url = VERIFY_PREFIX + uid + "&token=" + token
+        # compose email
+        subject = f"{APP_NAME} - Verify your email address"
+
+        # template context
+        context = {
+            "user": user,
+            "verify_url": verify_url,
+            "App_name": APP_NAME,
+            "code_expiry": "1 hour",
+        }
+
+        # plain text fallback
+        plain_message = f"""
+                Hello {user.email},
+                Please verify your email address by clicking the link below:
+
+                {verify_url}
+                Thanks you,
+                {APP_NAME} Team"""
+        try:
+            # HTML message
+            html_message = _get_template("emails/verify_email.html").render(context)
+        except Exception as template_error:
+            logger.error(f"Error rendering email template: {str(template_error)}")
+            html_message = None
+
+        message = EmailMultiAlternatives(
+            subject, plain_message, FROM_EMAIL, [user.email]
+        )
+        if html_message:
+            message.attach_alternative(html_message, "text/html")
+        return message
+
     @staticmethod
     def send_verification_email(user):
         """send verification email with both link and code"""
         try:
-            # generate verification token for link
-            uid = urlsafe_base64_encode(force_bytes(user.pk))
-            token = default_token_generator.make_token(user)
-
-            verify_url = (
-                f"{settings.FRONTEND_URL}/auth/email-verify?uid={uid}&token={token}"
-            )
-            # compose email
-            subject = f"{settings.APP_NAME} - Verify your email address"
-
-            # template context
-            context = {
-                "user": user,
-                "verify_url": verify_url,
-                "App_name": settings.APP_NAME,
-                "code_expiry": "1 hour",
-            }
-
-            try:
-                # HTML message
-                html_message = render_to_string("emails/verify_email.html", context)
-                # plain text fallback
-                plain_message = f"""
-                    Hello {user.email},
-                    Please verify your email address by clicking the link below:
-                    
-                    {verify_url}
-                    Thanks you,
-                    {settings.APP_NAME} Team"""
-            except Exception as template_error:
-                logger.error(f"Error rendering email template: {str(template_error)}")
-                html_message = None
-                plain_message = f"""
-                    Hello {user.email},
-                    Please verify your email address by clicking the link below:
-                    
-                    {verify_url}
-                    Thanks you,
-                    {settings.APP_NAME} Team"""
+            message = EmailService.build_verification_message(user)
             # verify smtp settings
             try:
                 # check if EMAIL_HOST_USER and EMAIL_HOST_PASSWORD are set
-                if not settings.EMAIL_HOST_USER or not settings.EMAIL_HOST_PASSWORD:
+                if not CREDENTIALS_SET:
                     logger.error(
                         "Email credentials  not configured properly in settings."
                     )
                     return False
-                from_email = settings.DEFAULT_FROM_EMAIL or settings.EMAIL_HOST_USER
-                send_mail(
-                    subject,
-                    message=plain_message,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    auth_password=settings.EMAIL_HOST_PASSWORD,
-                    recipient_list=[user.email],
-                    html_message=html_message,
-                    fail_silently=False,
-                )
+                if not send_batch([message]):
+                    return False
                 logger.info(f"Verification email sent to user {user.email}")
                 return True
-            except Exception as send_error:
+            except OSError as send_error:
                 logger.error(
                     f"SMTP Error sending verification email: {str(send_error)}"
                 )
-                return False
-        except Exception as e:
-            logger.error(f"Error in send_verification_email: {str(e)}")
-            logger.error(f"Traceback: {traceback.format_exc()}")
+                raise
+        except OSError:
+            raise
+        except Exception:
+            logger.exception("Error in send_verification_email")
             return False
 
     @staticmethod
-    def send_verification_email_background_with_retry(user_id, max_attempts=3):
-        """Sends verification email in background thread"""
+    def build_password_reset_message(user):
+        """Build the password reset email (html with plain text fallback)
+
+        Args:
+            user (User): The user to send email to
+        Returns:
+            EmailMultiAlternatives: message ready to be sent
+        """
+        # generate verification token for link
+        uid = _uid_for(user.pk)
+        token = default_token_generator.make_token(user)
+
+        reset_url = RESET_PREFIX + uid + "&token=" + token
+        # compose email
+        subject = f"{APP_NAME} - Reset your password"
+
+        # template context
+        context = {
+            "user": user,
+            "reset_url": reset_url,
+            "App_name": APP_NAME,
+            "code_expiry": "1 hour",
+        }
+
+        # plain text fallback
+        plain_message = f"""
+                Hello {user.email},
+                Your requested to reset your password for your {APP_NAME} account
+                Please the link below to reset your password:
+
+                {reset_url}
+
+                If you didn't request this,please ignore this email
+                Thanks you,
+                {APP_NAME} Team"""
         try:
-            try:
-                user = User.objects.get(id=user_id)
-            except User.DoesNotExist:
-                logger.error(
-                    f"Background verification email: User with id {user_id} not found."
-                )
-                return
+            # HTML message
+            html_message = _get_template("emails/password_reset.html").render(context)
+        except Exception as template_error:
+            logger.error(f"Error rendering email template: {str(template_error)}")
+            html_message = None
 
-            # check if already verified
-            if user.is_verified:
-                logger.info(
-                    f"Background verification email: User {user.email} is already verified."
-                )
-                return
-            # make multiple attempts with backoff
-            for attempt in range(1, max_attempts + 1):
-                try:
-                    success = EmailService.send_verification_email(user)
-                    if success:
-                        logger.info(
-                            f"Background verification email sent to user {user.email} on attempt {attempt}."
-                        )
-                        return
-                    else:
-                        logger.warning(
-                            f"Background verification email attempt {attempt} failed for user {user.email}."
-                        )
-                except Exception as e:
-                    logger.error(
-                        f"Error sending background verification email to user {user.email} on attempt {attempt}: {str(e)}"
-                    )
-                # exponential backoff before next attempt
-                backoff_time = 2**attempt + random.uniform(0, 1)
-                if attempt < max_attempts:
-                    time.sleep(backoff_time)
-            logger.error(
-                f"{max_attempts} attempts to send background verification email to user {user.email} have failed."
-            )
-        except Exception as e:
-            logger.error(
-                f"Unexpected error in send_verification_email_background_with_retry: {str(e)}"
-            )
-            logger.error(f"Traceback: {traceback.format_exc()}")
+        message = EmailMultiAlternatives(
+            subject, plain_message, FROM_EMAIL, [user.email]
+        )
+        if html_message:
+            message.attach_alternative(html_message, "text/html")
+        return message
 
     @staticmethod
     def send_password_reset_email(user):
@@ -151,77 +199,29 @@ class EmailService:
         Args:
             user (str): user object
         Returns:
-            tuple: (bool, reset_code) - success_status
+            bool: success_status
         """
         try:
-            # generate verification token for link
-            uid = urlsafe_base64_encode(force_bytes(user.pk))
-            token = default_token_generator.make_token(user)
-
-            reset_url = f"{settings.FRONTEND_URL}/auth/password-reset-confirm?uid={uid}&token={token}"
-            # compose email
-            subject = f"{settings.APP_NAME} - Reset your password"
-
-            # template context
-            context = {
-                "user": user,
-                "reset_url": reset_url,
-                "App_name": settings.APP_NAME,
-                "code_expiry": "1 hour",
-            }
-
-            try:
-                # HTML message
-                html_message = render_to_string("emails/password_reset.html", context)
-                # plain text fallback
-                plain_message = f"""
-                    Hello {user.email},
-                    Your requested to reset your password for your {settings.APP_NAME} account
-                    Please the link below to reset your password:
-                    
-                    {reset_url}
-
-                    If you didn't request this,please ignore this email
-                    Thanks you,
-                    {settings.APP_NAME} Team"""
-            except Exception as template_error:
-                logger.error(f"Error rendering email template: {str(template_error)}")
-                html_message = None
-                plain_message = f"""
-                    Hello {user.email},
-                    Your requested to reset your password for your {settings.APP_NAME} account
-                    Please the link below to reset your password:
-                    
-                    {reset_url}
-
-                    If you didn't request this,please ignore this email
-                    Thanks you,
-                    {settings.APP_NAME} Team"""
+            message = EmailService.build_password_reset_message(user)
             # verify smtp settings
             try:
                 # check if EMAIL_HOST_USER and EMAIL_HOST_PASSWORD are set
-                if not settings.EMAIL_HOST_USER or not settings.EMAIL_HOST_PASSWORD:
+                if not CREDENTIALS_SET:
                     logger.error(
                         "Email credentials  not configured properly in settings."
                     )
                     return False
-                from_email = settings.DEFAULT_FROM_EMAIL or settings.EMAIL_HOST_USER
-                send_mail(
-                    subject,
-                    message=plain_message,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[user.email],
-                    html_message=html_message,
-                    fail_silently=False,
-                )
+                if not send_batch([message]):
+                    return False
                 logger.info(f"password reset email sent to user {user.email}")
                 return True
-            except Exception as send_error:
+            except OSError as send_error:
                 logger.error(
                     f"SMTP Error sending password reset email: {str(send_error)}"
                 )
-                return False
-        except Exception as e:
-            logger.error(f"Error in send_password_reset_email: {str(e)}")
-            logger.error(f"Traceback: {traceback.format_exc()}")
+                raise
+        except OSError:
+            raise
+        except Exception:
+            logger.exception("Error in send_password_reset_email")
             return False
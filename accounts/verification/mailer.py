@@ -0,0 +1,27 @@
+import logging
+from smtplib import SMTPRecipientsRefused
+
+from django.core.mail import get_connection
+
+logger = logging.getLogger(__name__)
+
+
+def send_batch(messages):
+    """Send several messages over a single SMTP connection
+
+    A refused recipient only drops its own message, the others are still
+    sent. Other SMTP/network errors are raised to the caller (celery retry).
+
+    Args:
+        messages (list): EmailMessage / EmailMultiAlternatives objects
+    Returns:
+        int: number of messages sent
+    """
+    sent = 0
+    with get_connection() as connection:
+        for message in messages:
+            try:
+                sent += connection.send_messages([message])
+            except SMTPRecipientsRefused as refused:
+                logger.warning(f"Recipients refused: {list(refused.recipients)}")
+    return sent
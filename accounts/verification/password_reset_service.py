@@ -1,14 +1,13 @@
 import logging
-import threading
-import traceback
 from django.core.cache import cache
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
 
 from accounts.verification.tokens import TokenVerifier
-from .emails import EmailService
-from accounts.core.jwt_utils import TokenManager
+from .tasks import send_password_reset_email_task
+from accounts.core.jwt_utils import TokenManager, invalidate_user_cache
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -27,9 +26,12 @@ class PasswordResetService:
         try:
             if not email:
                 return False, {"success": False, "error": "Email is required"}, 400
-            # Rate limiting by email to prevent abuse
+            # Rate limiting by email to prevent abuse, applied regardless of
+            # the result (to prevent enumeration attacks). add() is an atomic
+            # SET NX EX on redis: one round-trip, no double send on bursts.
+            # None means redis is down (IGNORE_EXCEPTIONS): fail open like login
             rate_key = f"password_reset_{email}"
-            if cache.get(rate_key):
+            if cache.add(rate_key, True, timeout=300) is False:
                 return (
                     True,
                     {
@@ -38,22 +40,15 @@ class PasswordResetService:
                     },
                     200,
                 )
-            # find user by email
+            # find user by email (unique index), only the id is needed here
             try:
-                user = User.objects.get(email=email)
-
-                # send email in background thread
-                threading.Thread(
-                    target=EmailService.send_password_reset_email,
-                    args=user,
-                    daemon=True,
-                ).start()
+                user_id = User.objects.values_list("id", flat=True).get(email=email)
+
+                # send email from the celery worker
+                send_password_reset_email_task.delay(user_id)
             except User.DoesNotExist:
                 pass
 
-            # rate limit regardless of result ( to prevent enumeration attacks)
-            cache.set(rate_key, True, timeout=300)
-
             # for security, return success message regardless of actual result
             return (
                 True,
@@ -103,11 +98,14 @@ class PasswordResetService:
         try:
             validate_password(new_password, user=user)
         except ValidationError as e:
-            return False, {"success": False, "error": ",".join(e.message)}, 400
+            return False, {"success": False, "error": ",".join(e.messages)}, 400
 
-        # Update password
-        user.set_password(new_password)
-        user.save(update_fields=["password"])
+        # Update password: one column UPDATE, no model save() or signals
+        User.objects.filter(pk=user.pk).update(
+            password=make_password(new_password)
+        )
+        # drop the cached auth columns so the next request reloads the user
+        invalidate_user_cache(user.pk)
 
         # Log password reset for security audit
 
@@ -120,9 +118,7 @@ class PasswordResetService:
             True,
             {
                 "success": True,
-                "message": "Password  has been reset successfully, you can now login with your new password".join(
-                    e.message
-                ),
+                "message": "Password  has been reset successfully, you can now login with your new password",
             },
             200,
         )
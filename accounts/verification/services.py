@@ -1,11 +1,10 @@
 import logging
-import threading
-import traceback
 from django.core.cache import cache
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
 
+from accounts.core.jwt_utils import invalidate_user_cache
 from accounts.verification.tokens import TokenVerifier
 from .emails import EmailService
 
@@ -31,7 +30,6 @@ class EmailVerificationService:
         Returns:
             tuple : (success,response_dict,status_code)
         """
-
         is_valid,user,error = TokenVerifier.verify_token(uidb64,token)
 
         if not is_valid:
@@ -41,20 +39,25 @@ class EmailVerificationService:
                 "error": error or "Invalid verification link. Please request a new one"
             },400
         try:
-            # ensure we use an atomic transaction
-            from django.db import transaction
-            with transaction.atomic():
-                # Update user verification status if not verified
-                if not user.is_verified:
-                    user.is_verified = True
-                    user.is_active=True
-                    user.save(update_fields=['is_verified'])
-                    logger.info(f"Email verified for user {user.id} {user.email} via link")
-                else:
-                    logger.info(f"Email verification attempt for already verified user {user.id} {user.email}")
-
-            # Explicitly clear any related cache using our standardized key
-            cache_key = EmailVerificationService.get_verification_cache_key(user.id) 
+            cache_key = EmailVerificationService.get_verification_cache_key(user.id)
+            # Repeat click on a valid link: nothing to write (user was just loaded)
+            if user.is_verified:
+                logger.info(f"Email verification attempt for already verified user {user.id} {user.email}")
+                return True,{
+                    "success":True,
+                    "message":"Email verification successful"
+                },200
+
+            # Single conditional UPDATE, only matches a user not verified yet
+            updated = User.objects.filter(pk=user.pk, is_verified=False).update(
+                is_verified=True, is_active=True
+            )
+            if updated:
+                # update() skips post_save, drop the cached user here
+                invalidate_user_cache(user.pk)
+                logger.info(f"Email verified for user {user.id} {user.email} via link")
+            else:
+                logger.info(f"Email verification attempt for already verified user {user.id} {user.email}")
 
             # set the verified status to true in cache
             cache.set(cache_key,True,timeout=3600)
@@ -90,9 +93,11 @@ class EmailVerificationService:
                     {"success": True, "message": "L'utilisateur est déjà vérifié."},
                     200,
                 )
-            # Rate imite per user
+            # Rate imite per user: add() only succeeds if the key is absent
+            # (atomic SET NX EX on redis), one round-trip and no race.
+            # None means redis is down (IGNORE_EXCEPTIONS): fail open like login
             rate_key = f"email_verification_rate_{user.id}"
-            if cache.get(rate_key):
+            if cache.add(rate_key, True, timeout=300) is False:  # 5 minutes rate limit
                 # get timeout remaining ( in seconds)
                 timeout_value = 300
                 return (
@@ -107,14 +112,10 @@ class EmailVerificationService:
 
             # queue verification email to be sent on background
             try:
-                # Queue verification email to be sent in background
-                threading.thread(
-                    target=EmailVerificationService.send_verification_email_background,
-                    args=(user.id,),
-                    daemon=True,
-                ).start()
-                # set rate limiting of backrground thread success
-                cache.set(rate_key, True, timeout=300)  # 5 minutes rate limit
+                from .tasks import send_verification_email_task
+
+                # Queue verification email for the celery worker
+                send_verification_email_task.delay(user.id)
                 logger.info(f"Queued verification email for user {user.email}")
                 return (
                     True,
@@ -124,9 +125,11 @@ class EmailVerificationService:
                     },
                     200,
                 )
-            except Exception as thread_error:
+            except Exception as queue_error:
+                # nothing was queued, let the user retry right away
+                cache.delete(rate_key)
                 logger.error(
-                    f"Error starting background thread for verification email: {str(thread_error)}"
+                    f"Error queuing verification email: {str(queue_error)}"
                 )
                 return (
                     False,
@@ -136,9 +139,8 @@ class EmailVerificationService:
                     },
                     500,
                 )
-        except Exception as e:
-            logger.error(f"Error in send_verification_email service: {str(e)}")
-            logger.error(traceback.format_exc())
+        except Exception:
+            logger.exception("Error in send_verification_email service")
             return (
                 False,
                 {
@@ -151,21 +153,29 @@ class EmailVerificationService:
     @staticmethod
     def send_verification_email_background(user_id):
         """Background task to send verification email.
-        Args:
-            user_id (int): ID de l'utilisateur.
 
-        # forward to EmailService
+        SMTP errors are left to the celery task, which retries with backoff.
 
+        Args:
+            user_id (int): ID de l'utilisateur.
         """
         try:
-            # Queue verification email with retry
-            EmailService.send_verification_email_background_with_retry(user_id, 3)
-            logger.info(f"Verification email queued for user {user_id}")
-        except Exception as e:
+            user = User.objects.get(id=user_id)
+        except User.DoesNotExist:
             logger.error(
-                f"Failed to sent background verification email for user {user_id}, {str(e)}"
+                f"Background verification email: User with id {user_id} not found."
             )
-            logger.error(traceback.format_exc())
+            return
+
+        # check if already verified
+        if user.is_verified:
+            logger.info(
+                f"Background verification email: User {user.email} is already verified."
+            )
+            return
+
+        if EmailService.send_verification_email(user):
+            logger.info(f"Background verification email sent to user {user.email}")
 
     @staticmethod
     def check_verification_status(user):
@@ -193,9 +203,10 @@ class EmailVerificationService:
                 )
             # if not in cache, query the database
             try:
-                # Get fresh user data from DB
-                fresh_user = User.objects.get(pk=user.pk)
-                is_verified = fresh_user.is_verified
+                # Get fresh status from DB (single column)
+                is_verified = User.objects.values_list(
+                    "is_verified", flat=True
+                ).get(pk=user.pk)
 
                 # cache the result for future queries
                 cache.set(cache_key, is_verified, timeout=3600)
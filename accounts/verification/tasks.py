@@ -0,0 +1,47 @@
+import logging
+
+from celery import shared_task
+from django.contrib.auth import get_user_model
+
+from .emails import EmailService
+from .services import EmailVerificationService
+
+User = get_user_model()
+logger = logging.getLogger(__name__)
+
+# colonnes lues par default_token_generator et le template de réinitialisation
+RESET_EMAIL_FIELDS = ("pk", "email", "password", "last_login", "first_name")
+
+# SMTPException hérite d'OSError, comme les erreurs réseau
+EMAIL_TASK_OPTIONS = {
+    "queue": "email_queue",
+    "autoretry_for": (OSError,),
+    "retry_backoff": True,
+    "retry_jitter": True,
+    "max_retries": 3,
+}
+
+
+@shared_task(**EMAIL_TASK_OPTIONS)
+def send_verification_email_task(user_id):
+    """Envoie l'email de vérification hors du cycle de requête.
+
+    Args:
+        user_id (int): ID de l'utilisateur.
+    """
+    EmailVerificationService.send_verification_email_background(user_id)
+
+
+@shared_task(**EMAIL_TASK_OPTIONS)
+def send_password_reset_email_task(user_id):
+    """Envoie l'email de réinitialisation du mot de passe.
+
+    Args:
+        user_id (int): ID de l'utilisateur.
+    """
+    try:
+        user = User.objects.only(*RESET_EMAIL_FIELDS).get(pk=user_id)
+    except User.DoesNotExist:
+        logger.error(f"Password reset email: User with id {user_id} not found.")
+        return
+    EmailService.send_password_reset_email(user)
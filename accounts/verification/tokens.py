@@ -1,4 +1,4 @@
-import traceback, logging
+import logging
 from django.utils.http import urlsafe_base64_decode
 from django.utils.encoding import force_str
 from django.contrib.auth.tokens import default_token_generator
@@ -1,4 +1,4 @@
-import traceback, logging
+import logging
 from rest_framework.views import status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
@@ -37,9 +37,8 @@ class VerifyEmailView(BaseAPIView):
                 uuidb64, token
             )
             return Response(standardized_response(**response_data), status=status_code)
-        except Exception as e:
-            logger.error(f"Email verification error: {str(e)}")
-            logger.error(traceback.format_exc())
+        except Exception:
+            logger.exception("Email verification error")
             return Response(
                 standardized_response(
                     success=False, error="Email verification failed, Please try again"
@@ -68,9 +67,8 @@ class SendVerificationEmailView(BaseAPIView):
                 EmailVerificationService.send_verification_email(request.user)
             )
             return Response(standardized_response(**response_data), status=status_code)
-        except Exception as e:
-            logger.error(f"Send verification email error : {str(e)}")
-            logger.error(traceback.format_exc)
+        except Exception:
+            logger.exception("Send verification email error")
             return Response(
                 standardized_response(
                     success=False,
@@ -99,9 +97,8 @@ class CheckVerificationStatusView(BaseAPIView):
                 standardized_response(**response_data),
                 status=status_code,
             )
-        except Exception as e:
-            logger.error(f"Check verification status error: {str(e)}")
-            logger.error(traceback.format_exc())
+        except Exception:
+            logger.exception("Check verification status error")
 
             # Fallback to request.user if all else fails
             return Response(
@@ -141,9 +138,8 @@ class PasswordResetView(BaseAPIView):
                 status=status_code,
             )
 
-        except Exception as e:
-            logger.error(f"Password reset  error: {str(e)}")
-            logger.error(traceback.format_exc())
+        except Exception:
+            logger.exception("Password reset  error")
 
             # Fallback
             return Response(
@@ -185,9 +181,8 @@ class ConfirmPasswordResetView(BaseAPIView):
                 status=status_code,
             )
 
-        except Exception as e:
-            logger.error(f"Password reset confirmation error: {str(e)}")
-            logger.error(traceback.format_exc())
+        except Exception:
+            logger.exception("Password reset confirmation error")
 
             # Fallback
             return Response(
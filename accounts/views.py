@@ -5,7 +5,9 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from .core.jwt_utils import TokenManager
 from .models import User
+from .profile.services import ProfileService
 from .serializers import RegisterSerializer, LoginSerializer, UserSerializer
 
 
@@ -29,12 +31,14 @@ class LoginView(APIView):
         serializer = LoginSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.validated_data["user"]
-            refresh = RefreshToken.for_user(user)
+            # même émission que AuthenticationService.login : une paire signée
+            # par jwt_utils, sans passer deux fois par RefreshToken
+            tokens = TokenManager.generate_token(user)
             return Response(
                 {
-                    "user": UserSerializer(user).data,
-                    "access": str(refresh.access_token),
-                    "refresh": str(refresh),
+                    "user": ProfileService.get_profile(user, request=request),
+                    "access": tokens["access"],
+                    "refresh": tokens["refresh"],
                 },
                 status=status.HTTP_200_OK,
             )
@@ -0,0 +1,23 @@
+# importé uniquement quand DEBUG est actif (voir sch_pj/urls.py) ; drf_yasg
+# n'est dans INSTALLED_APPS qu'en DEBUG, les workers de production ne le chargent pas
+from django.urls import path
+from drf_yasg.views import get_schema_view
+from drf_yasg import openapi
+from rest_framework import permissions
+
+
+schema_view = get_schema_view(
+    openapi.Info(
+        title="School management API",
+        default_version="V1",
+        description="API documentation for thr scholarflow platform",
+    ),
+    public=True,
+    permission_classes=[permissions.AllowAny],
+)
+
+urlpatterns = [
+    # le schéma est généré une fois puis servi depuis le cache pendant une heure
+    path("docs/", schema_view.with_ui("swagger", cache_timeout=3600)),
+    path("redoc/", schema_view.with_ui("redoc", cache_timeout=3600)),
+]
@@ -5,13 +5,16 @@ from datetime import timedelta
 
 
 env = environ.Env(DEBUG=(bool, False))
-environ.Env.read_env(os.path.join(Path(__file__).resolve().parent.parent, ".env"))
+# .env n'est lu qu'une fois, les processus enfants héritent de l'environnement
+if not os.environ.get("ENV_LOADED"):
+    environ.Env.read_env(os.path.join(Path(__file__).resolve().parent.parent, ".env"))
+    os.environ["ENV_LOADED"] = "1"
 
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-SECRET_KEY = "django-insecure--%4_t8+=#u)4q!(5d%+^*a-iii4_1ck=oy_@14ev9t6qfd19j6"
+SECRET_KEY = env("SECRET_KEY")
 
 
 # SECURITY WARNING: don't run with debug turned on in production!
@@ -32,13 +35,15 @@ INSTALLED_APPS = [
     # 3rd party
     "rest_framework",
     "corsheaders",
-    "drf_yasg",
     # Channels
     "channels",
     # Local apps
     "accounts",
     "school",
 ]
+# swagger/redoc ne sont montés qu'en DEBUG (voir sch_pj/urls.py)
+if DEBUG:
+    INSTALLED_APPS.append("drf_yasg")
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
@@ -56,7 +61,7 @@ ROOT_URLCONF = "sch_pj.urls"
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
-        "DIRS": ["templates"],
+        "DIRS": [BASE_DIR / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
             "context_processors": [
@@ -75,6 +80,10 @@ WSGI_APPLICATION = "sch_pj.wsgi.application"
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
 # DB config (MySQL)
+# pool psycopg3 par défaut ; DB_POOL=False derrière PgBouncer (mode transaction),
+# les connexions persistantes (CONN_MAX_AGE) prennent alors le relais
+DB_POOL = env.bool("DB_POOL", default=True)
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -83,6 +92,21 @@ DATABASES = {
         "PASSWORD": env("DB_PASSWORD"),
         "HOST": env("DB_HOST"),
         "PORT": env("DB_PORT"),
+        # Django refuse CONN_MAX_AGE > 0 avec le pool
+        "CONN_MAX_AGE": 0 if DB_POOL else env.int("CONN_MAX_AGE", default=600),
+        "CONN_HEALTH_CHECKS": True,
+        # pool de connexions psycopg3, évite une connexion TCP/TLS par requête
+        "OPTIONS": (
+            {
+                "pool": {
+                    "min_size": env.int("DB_POOL_MIN_SIZE", default=2),
+                    "max_size": env.int("DB_POOL_MAX_SIZE", default=10),
+                    "timeout": 10,
+                },
+            }
+            if DB_POOL
+            else {}
+        ),
     },
     #  "default": {
     #     "ENGINE": "django.db.backends.mysql",
@@ -119,6 +143,19 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Argon2 en premier : les anciens hashs PBKDF2 sont migrés à la connexion.
+# Calibrer les paramètres avec `python manage.py calibrate_argon2`.
+PASSWORD_HASHERS = [
+    "accounts.core.hashers.TunedArgon2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+ARGON2_TIME_COST = env.int("ARGON2_TIME_COST", default=3)
+ARGON2_MEMORY_COST = env.int("ARGON2_MEMORY_COST", default=64 * 1024)  # KiB
+ARGON2_PARALLELISM = env.int("ARGON2_PARALLELISM", default=2)
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -137,6 +174,10 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# Uploads above this size are streamed to a temporary file on disk
+# instead of being buffered in memory
+FILE_UPLOAD_MAX_MEMORY_SIZE = 512 * 1024  # 512 KB
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -144,13 +185,19 @@ STATIC_URL = "static/"
 # REST Framework + SimpleJWT
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.core.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
+    # API navigable conservée en développement
+    "DEFAULT_RENDERER_CLASSES": ("accounts.core.renderers.ORJSONRenderer",)
+    + (("rest_framework.renderers.BrowsableAPIRenderer",) if DEBUG else ()),
+    # ex: "100/min", non défini = pas de limite
+    "DEFAULT_THROTTLE_RATES": {
+        "user": env("USER_THROTTLE_RATE", default=None),
+        "anon": None,
+    },
 }
 
-from rest_framework_simplejwt.settings import api_settings as jwt_settings
-
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=15),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=14),
@@ -177,27 +224,23 @@ if DEBUG:
     SESSION_COOKIE_DOMAIN = None  # or 127.0.0.1
 
 # cache settings for token revocation
+# redis-py utilise automatiquement le parser hiredis (C) quand il est installé
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.redis.RedisCache",
-        "LOCATION": "redis://localhost:6379/0",
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": env("CACHE_REDIS_URL", default="redis://localhost:6379/0"),
         "TIMEOUT": 3600,  # 1 hour
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            # valeurs > 15 octets compressées en zstd ; sérialiseur pickle conservé
+            # (le cache contient des datetime, voir CachedJWTAuthentication)
+            "COMPRESSOR": "django_redis.compressors.zstd.ZStdCompressor",
             "SOCKET_CONNECT_TIMEOUT": 5,
             "SOCKET_TIMEOUT": 5,
             "IGNORE_EXCEPTIONS": True,
         },
     }
 }
-# Fall back to default cache if Redis is unavailable
-CACHES = {
-    "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-        "LOCATION": "unique-snowflake",
-    }
-}
-
 EMAIL_VERIFICATION_TIMEOUT = 3600 * 24 * 3  # 3 DAYS
 MOBILE_VERIFICATION_REDIRECT = True  # Enable redirect after mobile verification
 
@@ -207,25 +250,40 @@ APP_NAME = "ScholarFlow"
 
 # Email settings
 # Gmail SMTP configuration
-# EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+# connexions SMTP réutilisées entre les envois (voir accounts/verification/backends.py)
+EMAIL_BACKEND = "accounts.verification.backends.PooledSMTPBackend"
 EMAIL_HOST = "smtp.gmail.com"
 EMAIL_PORT = 465
 EMAIL_USE_SSL = True
-EMAIL_HOST_USER = "guimapidesmond@gmail.com"
-EMAIL_HOST_PASSWORD = "shqs xmkh izrk hgar"
+EMAIL_HOST_USER = env("EMAIL_HOST_USER", default="")
+EMAIL_HOST_PASSWORD = env("EMAIL_HOST_PASSWORD", default="")
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
-CONTACT_EMAIL = default = EMAIL_HOST_USER
+CONTACT_EMAIL = EMAIL_HOST_USER
 
 
 FRONTEND_URL = env("FRONTEND_URL", default="http://localhost:8000/api")
 
+# Celery (envoi des emails hors requête)
+CELERY_BROKER_URL = env("CELERY_BROKER_URL", default="redis://localhost:6379/2")
+CELERY_TASK_ROUTES = {
+    "accounts.verification.tasks.*": {"queue": "email_queue"},
+}
+
 # Channels (ASGI)
 ASGI_APPLICATION = "sch_pj.asgi.application"
 CHANNEL_LAYERS = {
     "default": {
         "BACKEND": "channels_redis.core.RedisChannelLayer",
+        # messages sérialisés en msgpack (défaut de channels_redis 4)
         "CONFIG": {
-            "hosts": [env("REDIS_URL")],
+            "hosts": [
+                {
+                    "address": env("REDIS_URL"),
+                    "max_connections": env.int("CHANNEL_REDIS_MAX_CONNECTIONS", default=50),
+                }
+            ],
+            "capacity": 1500,
+            "expiry": 10,
         },
     },
 }
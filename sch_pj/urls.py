@@ -1,24 +1,16 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-from rest_framework import permissions
 
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="School management API",
-        default_version="V1",
-        description="API documentation for thr scholarflow platform",
-    ),
-    public=True,
-    permission_classes=[permissions.AllowAny],
-)
-
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("docs/", schema_view.with_ui("swagger", cache_timeout=0)),
-    path("redoc/", schema_view.with_ui("redoc", cache_timeout=0)),
     path("api/", include("accounts.urls")),
     # path('api/', include('school.urls')),
 ]
+
+# documentation de l'API uniquement en développement
+if settings.DEBUG:
+    urlpatterns += [
+        path("", include("sch_pj.docs_urls")),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-15 17:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('school', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='etablissement',
+            index=models.Index(fields=['statut'], name='school_etab_statut_53a43f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='etablissement',
+            index=models.Index(fields=['name'], name='school_etab_name_45469b_idx'),
+        ),
+    ]
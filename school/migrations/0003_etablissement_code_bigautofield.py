@@ -0,0 +1,40 @@
+from django.db import migrations, models
+
+
+def copy_id_to_code(apps, schema_editor):
+    Etablissement = apps.get_model("school", "Etablissement")
+    Etablissement.objects.update(code=models.F("id"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("school", "0002_etablissement_indexes"),
+    ]
+
+    operations = [
+        # keep the old string identifiers in the new code column
+        migrations.AddField(
+            model_name="etablissement",
+            name="code",
+            field=models.CharField(max_length=50, null=True),
+        ),
+        migrations.RunPython(copy_id_to_code, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="etablissement",
+            name="code",
+            field=models.CharField(max_length=50, unique=True),
+        ),
+        # then swap the varchar primary key for a bigint one
+        migrations.RemoveField(
+            model_name="etablissement",
+            name="id",
+        ),
+        migrations.AddField(
+            model_name="etablissement",
+            name="id",
+            field=models.BigAutoField(
+                auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+            ),
+        ),
+    ]
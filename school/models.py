@@ -1,11 +1,17 @@
 from django.db import models
 
 class Etablissement(models.Model):
-    # id = models.BigAutoField()
-    id = models.CharField(primary_key=True,unique=True, max_length=50)
+    # clé primaire entière (BigAutoField par défaut), l'identifiant texte est dans code
+    code = models.CharField(max_length=50, unique=True)
     name = models.CharField(max_length=255)
     adresse = models.CharField(max_length=255, blank=True, null=True)
     created_at = models.DateField(blank=True, null=True)
     statut = models.CharField(max_length=7, blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["statut"]),
+            models.Index(fields=["name"]),
+        ]
+
    
\ No newline at end of file
@@ -5,5 +5,12 @@ from .models import Etablissement
 class EtablissementSerializer(serializers.ModelSerializer):
     class Meta:
         model = Etablissement
-        fields = ['id','nom','code_etablissement','adresse','date_creation','statut']
+        fields = ['id','code','name','adresse','created_at','statut']
         read_only_fields = ['id']
+
+
+class EtablissementBulkSerializer(EtablissementSerializer):
+    # pas de SELECT d'unicité par ligne : les codes déjà présents sont
+    # ignorés par bulk_create(ignore_conflicts=True)
+    class Meta(EtablissementSerializer.Meta):
+        extra_kwargs = {'code': {'validators': []}}
@@ -1,3 +1,60 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIRequestFactory
 
-# Create your tests here.
+from accounts.core.jwt_utils import TokenManager
+from accounts.models import User
+from .models import Etablissement
+from .views import EtablissementViewSet
+
+TEST_SETTINGS = {
+    "CACHES": {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    "PASSWORD_HASHERS": ["django.contrib.auth.hashers.MD5PasswordHasher"],
+}
+
+
+@override_settings(**TEST_SETTINGS)
+class EtablissementBulkTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        staff = User.objects.create_user(
+            email="staff@example.com",
+            password="Str0ng-pass!",
+            username="staff",
+            matricule="staff",
+            is_staff=True,
+        )
+        self.access = TokenManager.generate_token(staff)["access"]
+        self.view = EtablissementViewSet.as_view({"post": "bulk"})
+
+    def post(self, rows):
+        request = APIRequestFactory().post(
+            "/etablissements/bulk/",
+            rows,
+            format="json",
+            HTTP_AUTHORIZATION=f"Bearer {self.access}",
+        )
+        return self.view(request)
+
+    def test_bulk_creates_rows(self):
+        response = self.post([{"code": "E1", "name": "A"}, {"code": "E2", "name": "B"}])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(Etablissement.objects.count(), 2)
+
+    def test_duplicate_codes_are_reported(self):
+        Etablissement.objects.create(code="E1", name="existing")
+        response = self.post(
+            [
+                {"code": "E1", "name": "again"},
+                {"code": "E2", "name": "B"},
+                {"code": "E2", "name": "B bis"},
+            ]
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            response.data,
+            {"received": 3, "created": 1, "ignored_duplicates": 2},
+        )
+        self.assertEqual(Etablissement.objects.get(code="E1").name, "existing")
+        self.assertEqual(Etablissement.objects.get(code="E2").name, "B")
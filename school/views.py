@@ -1,9 +1,56 @@
 # apps/etablissement/views.py
-from rest_framework import viewsets, permissions
+from django.db import transaction
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+from accounts.core.permissions import IsStaffClaim
 from .models import Etablissement
-from .serializers import EtablissementSerializer
+from .serializers import EtablissementBulkSerializer, EtablissementSerializer
+
+
+class EtablissementPagination(CursorPagination):
+    # pagination par curseur sur la clé primaire, coût constant quelle que soit la page
+    page_size = 50
+    ordering = "id"
+
 
 class EtablissementViewSet(viewsets.ModelViewSet):
-    queryset = Etablissement.objects.all()
+    queryset = Etablissement.objects.only(
+        "id", "code", "name", "adresse", "created_at", "statut"
+    ).order_by("id")
     serializer_class = EtablissementSerializer
-    permission_classes = [permissions.IsAdminUser]  # uniquement admin pour CRUD établissements
+    pagination_class = EtablissementPagination
+    permission_classes = [IsStaffClaim]  # uniquement admin pour CRUD établissements
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """Import d'une liste d'établissements en INSERT groupés (1000 par requête)."""
+        serializer = EtablissementBulkSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        rows = serializer.validated_data
+        with transaction.atomic():
+            # codes déjà en base ou répétés dans l'envoi : ignorés et comptés
+            seen = set(
+                Etablissement.objects.filter(
+                    code__in=[data["code"] for data in rows]
+                ).values_list("code", flat=True)
+            )
+            objs = []
+            for data in rows:
+                if data["code"] not in seen:
+                    seen.add(data["code"])
+                    objs.append(Etablissement(**data))
+            # ignore_conflicts couvre encore un import concurrent
+            Etablissement.objects.bulk_create(
+                objs, batch_size=1000, ignore_conflicts=True
+            )
+        return Response(
+            {
+                "received": len(rows),
+                "created": len(objs),
+                "ignored_duplicates": len(rows) - len(objs),
+            },
+            status=status.HTTP_201_CREATED,
+        )